@@ -0,0 +1,198 @@
+"""
+run_bench.py — Offline micro-benchmarks for the extraction and normalization hot paths.
+
+Runs without a browser or network:
+  • page extractors against the saved retailer pages in bench/fixtures/
+  • slug_to_name / normalize_canonical / brand + non-shoe classification
+    against the slugs in the checked-in *_links.txt files
+
+Each case reports ops/sec (one op = one page or one slug) and the peak memory
+allocated per op, and is compared against bench/baseline.json.
+
+    python bench/run_bench.py                 # run everything, compare to baseline
+    python bench/run_bench.py price canon     # only cases whose name contains a filter
+    python bench/run_bench.py --save          # run and overwrite the baseline
+    python bench/run_bench.py --check         # exit 1 if any case regressed
+
+Numbers are machine-specific: re-save the baseline when switching machines,
+then benchmark a change against it on the same machine.
+"""
+
+import glob
+import json
+import os
+import platform
+import sys
+import timeit
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+
+import canonical
+import resolver
+import shoe_filter
+import sneaker_bot
+from page_snapshot import PageSnapshot
+
+FIXTURES_DIR  = os.path.join(HERE, "fixtures")
+BASELINE_FILE = os.path.join(HERE, "baseline.json")
+MIN_TIME      = 0.5   # seconds per timing run
+REPEATS       = 5     # best of N runs
+CORPUS_LIMIT  = 2000  # slugs per link file, to keep a full run short
+ALLOC_SAMPLE  = 200   # inputs sampled for the allocation figure
+THRESHOLD     = 0.10  # ±10% vs baseline counts as a real change
+
+
+# ── Inputs ────────────────────────────────────────────────────────────────────
+def load_fixtures() -> dict:
+    """{'cdc': '<html>...', 'vnv': ...} from bench/fixtures/*.html."""
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            pages[os.path.splitext(os.path.basename(path))[0]] = f.read()
+    return pages
+
+
+def load_slugs() -> dict:
+    """{'cdc': [slug, ...], ...} from the product URLs in ROOT/*_links.txt."""
+    corpora = {}
+    for path in sorted(glob.glob(os.path.join(ROOT, "*_links.txt"))):
+        name = os.path.basename(path).replace("_links.txt", "")
+        with open(path, "r", encoding="utf-8") as f:
+            slugs = [shoe_filter.slug_of(line.strip()) for line in f
+                     if "/products/" in line and not line.startswith("#")]
+        corpora[name] = [s for s in slugs if s][:CORPUS_LIMIT]
+    return corpora
+
+
+# ── Cases ─────────────────────────────────────────────────────────────────────
+def build_cases(pages: dict, corpora: dict) -> list:
+    """[(case name, function, inputs)] — the function is called once per input."""
+    cases = []
+    for site, html in pages.items():
+        cases += [
+            (f"snapshot.parse[{site}]",  PageSnapshot.from_html,     [html]),
+            (f"extract_price[{site}]",   sneaker_bot.extract_price,  [html]),
+            (f"extract_name[{site}]",    sneaker_bot.extract_name,   [html]),
+            (f"extract_product[{site}]", sneaker_bot.extract_product, [html]),
+        ]
+    # Names as the bot builds them from slugs; the canonical/brand caches are
+    # bypassed (__wrapped__) so every op measures a cold computation.
+    for corpus, slugs in corpora.items():
+        names = [sneaker_bot.slug_to_name(s) for s in slugs]
+        cases += [
+            (f"slug_to_name[{corpus}]",        sneaker_bot.slug_to_name,                  slugs),
+            (f"is_non_shoe[{corpus}]",         shoe_filter.is_non_shoe,                   slugs),
+            (f"normalize_canonical[{corpus}]", canonical.normalize_canonical.__wrapped__, names),
+            (f"brand_from_text[{corpus}]",     resolver.brand_from_text.__wrapped__,      names),
+        ]
+    return cases
+
+
+# ── Measurement ───────────────────────────────────────────────────────────────
+def ops_per_sec(func, inputs: list) -> float:
+    def run():
+        for x in inputs:
+            func(x)
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()          # smallest count taking ≥ 0.2 s
+    number = max(1, int(number * MIN_TIME / 0.2))
+    best = min(timer.repeat(repeat=REPEATS, number=number))
+    return len(inputs) * number / best
+
+
+def alloc_per_op(func, inputs: list) -> float:
+    """Mean peak bytes allocated during a single call, over a sample of inputs."""
+    sample = inputs[:ALLOC_SAMPLE]
+    tracemalloc.start()
+    total = 0
+    try:
+        for x in sample:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            func(x)
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - before
+    finally:
+        tracemalloc.stop()
+    return total / len(sample)
+
+
+# ── Baseline ──────────────────────────────────────────────────────────────────
+def load_baseline() -> dict:
+    try:
+        with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f).get("results", {})
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_baseline(results: dict) -> None:
+    data = {
+        "python":   platform.python_version(),
+        "machine":  platform.machine(),
+        "results":  results,
+    }
+    with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def _delta(now: float, then: float) -> str:
+    if not then:
+        return "      new"
+    change = now / then - 1
+    mark = "🚀" if change > THRESHOLD else "🐢" if change < -THRESHOLD else "  "
+    return f"{change:+7.1%} {mark}"
+
+
+# ==========================================
+# MAIN
+# ==========================================
+def main():
+    args    = sys.argv[1:]
+    save    = "--save" in args
+    check   = "--check" in args
+    filters = [a for a in args if not a.startswith("--")]
+
+    cases = build_cases(load_fixtures(), load_slugs())
+    if filters:
+        cases = [c for c in cases if any(f in c[0] for f in filters)]
+    baseline = load_baseline()
+
+    print(f"\n⏱️  {len(cases)} benchmark cases  (Python {platform.python_version()}, best of {REPEATS})\n")
+    print(f"{'case':<36} {'ops/sec':>12} {'vs base':>10}   {'alloc/op':>10} {'vs base':>10}")
+    print("─" * 86)
+
+    results, regressions = {}, []
+    for name, func, inputs in cases:
+        ops   = ops_per_sec(func, inputs)
+        alloc = alloc_per_op(func, inputs)
+        results[name] = {"ops_per_sec": round(ops, 1), "alloc_bytes": round(alloc)}
+        base = baseline.get(name, {})
+        # For allocations, smaller is better — invert so 🚀 always means "improved"
+        alloc_delta = _delta(base["alloc_bytes"], alloc) if base else _delta(alloc, 0)
+        print(f"{name:<36} {ops:>12,.0f} {_delta(ops, base.get('ops_per_sec', 0)):>10}   "
+              f"{alloc / 1024:>8.1f}KB {alloc_delta:>10}")
+        if base and ops < base["ops_per_sec"] * (1 - THRESHOLD):
+            regressions.append(name)
+
+    print()
+    if save:
+        if filters:
+            baseline.update(results)
+            results = baseline
+        save_baseline(results)
+        print(f"💾 Baseline saved → {os.path.relpath(BASELINE_FILE, ROOT)}")
+    elif not baseline:
+        print("ℹ️  No baseline yet — run with --save to store this run as the baseline.")
+    if regressions:
+        print(f"🐢 {len(regressions)} case(s) more than {THRESHOLD:.0%} slower than baseline: {', '.join(regressions)}")
+        if check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+canonical.py — Shoe-name canonicalization shared by sneaker_bot.py and fix_nb_models.py.
+
+normalize_canonical() turns a retailer display name into the stable key used to
+merge the same shoe across retailers; make_canonical_id() hashes it (with the
+brand) into the MongoDB _id. Every pattern is compiled once, the 14 brand-prefix
+strips collapse into one anchored regex, and results are memoised in a bounded
+LRU cache, so re-canonicalizing a full catalog is cheap.
+
+    normalize_canonical("Nike Dunk Low Retro (2021) DD1391-100 Panda")  → "dunk low panda"
+    canonicalize_many(names)  → one canonical per name, duplicates computed once
+"""
+
+import hashlib
+import re
+import unicodedata
+from functools import lru_cache
+
+CACHE_SIZE = 65536  # distinct names memoised per process
+
+_NOISE_WORDS = frozenset({
+    'the', 'and', 'with', 'for', 'by', 'in', 'a', 'an',
+    # Jordan-line: "Jordan 1 Retro High" == "Jordan 1 High" at Indian retailers
+    'retro',
+    # Size/age suffixes that some retailers append
+    'gs', 'ps', 'td', 'bp', 'preschool', 'gradeschool', 'toddler',
+})
+
+# Stripped in this order, each at most once — e.g. "nike jordan brand ..." loses both.
+_BRAND_PREFIXES = [
+    'nike', 'adidas', 'new balance', 'jordan brand',
+    'converse', 'reebok', 'asics', 'puma',
+    'vans', 'on running', 'hoka one one', 'hoka',
+    'salomon', 'ugg',
+]
+# A chain of optional groups applies the prefixes in sequence, exactly like
+# one re.sub(r'^<brand>\s+', '', s, count=1) per brand.
+_BRAND_PREFIX_RE = re.compile(
+    '^' + ''.join(r'(?:' + re.escape(b).replace(r'\ ', ' ') + r'\s+)?' for b in _BRAND_PREFIXES)
+)
+
+# Style codes — require ≥1 letter for letters-first codes so NB model numbers
+# like 1000/9060/2002 are NOT stripped; digits-first codes need 5+ digits so
+# NB 2002R/1906D survive.
+#   letters-first: DH7138-006, FZ5112    digit-dash: 555088-101    digits-first: 162053c (Converse)
+_STYLE_CODE = r'\b[a-z]{1,3}\d{4,6}(?:-\d{3})?\b|\b\d{4,6}-\d{3}\b|\b\d{5,6}[a-z]{1,2}\b'
+_STYLE_CODE_RE         = re.compile(_STYLE_CODE)
+_DISPLAY_STYLE_CODE_RE = re.compile(_STYLE_CODE, re.IGNORECASE)
+_ORPHAN_SUFFIX_RE      = re.compile(r'\s\d{3}\b')       # " 100" left behind by "Dd8959 100"
+_BRACKETED_RE          = re.compile(r'\([^)]*\)')       # (2015), (W)
+_SQUARE_BRACKETED_RE   = re.compile(r'\[[^\]]*\]')      # [restock]
+_NON_ALNUM_RE          = re.compile(r'[^a-z0-9\s]')
+_WHITESPACE_RE         = re.compile(r'\s+')
+_QUOTES                = str.maketrans('', '', '\'"')
+
+
+def _ascii_fold(name: str) -> str:
+    if name.isascii():
+        return name
+    return unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_canonical(name: str) -> str:
+    """Return a stable lowercase ASCII key for matching the same shoe across retailers."""
+    s = _ascii_fold(name).lower()
+    s = _BRAND_PREFIX_RE.sub('', s, count=1)
+    s = _STYLE_CODE_RE.sub('', s)
+    s = _BRACKETED_RE.sub('', s)
+    s = _SQUARE_BRACKETED_RE.sub('', s)
+    s = s.translate(_QUOTES)
+    s = _NON_ALNUM_RE.sub(' ', s)
+    return ' '.join(t for t in s.split() if t not in _NOISE_WORDS)
+
+
+def canonicalize_many(names) -> list:
+    """normalize_canonical() for a whole list of names; repeats are computed once."""
+    seen: dict = {}
+    out = []
+    for name in names:
+        c = seen.get(name)
+        if c is None:
+            c = seen[name] = normalize_canonical(name)
+        out.append(c)
+    return out
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def strip_style_codes(name: str) -> str:
+    """Remove retailer style codes from a display name.
+    Handles both formats:
+      letters-first: Dd8959, B75806, FZ5112, CW7891-001
+      digits-first:  162053c, 162056c  (Converse format)
+    Also cleans up an orphaned 3-digit suffix left by letters-first codes (e.g. " 100").
+    """
+    s = _DISPLAY_STYLE_CODE_RE.sub('', name)
+    s = _ORPHAN_SUFFIX_RE.sub('', s)
+    return _WHITESPACE_RE.sub(' ', s).strip()
+
+
+def make_canonical_id(canonical: str, brand: str) -> str:
+    """Deterministic MongoDB _id from canonical name + brand. Prefix 'c_' distinguishes
+    from legacy random 's_' IDs so old documents are never accidentally overwritten."""
+    key = f"{brand.lower().strip()}||{canonical}"
+    return 'c_' + hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
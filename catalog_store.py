@@ -0,0 +1,189 @@
+"""
+catalog_store.py — Local SQLite catalog of scraped items.
+
+Replaces the append-only sneaker_dump.txt. Every item sneaker_bot saves is
+upserted here, one row per product URL (a re-scrape replaces the old row),
+with the full item kept as JSON next to indexed columns:
+
+    url (primary key) · canonical_id · brand · retailer · price · scraped_at
+
+The database runs in WAL mode with a busy timeout, so the batch writer, an
+offline --replay and a query from another terminal can all use it at once.
+
+    python3 catalog_store.py stats
+    python3 catalog_store.py export out.jsonl [--brand Nike] [--retailer Superkicks] [--since 2026-10-01]
+    python3 catalog_store.py import-dump sneaker_dump.txt      # load an old dump file
+    python3 sneaker_bot.py --upload [--since=2026-10-01]        # push the catalog to MongoDB
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+from canonical import make_canonical_id, normalize_canonical
+from resolver import resolve_retailer
+
+CATALOG_DB   = os.environ.get("SNEAKER_CATALOG_DB", "sneaker_catalog.db")
+BUSY_TIMEOUT = 30.0   # seconds a writer waits for another one's lock
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    url            TEXT PRIMARY KEY,
+    canonical_id   TEXT NOT NULL,
+    shoe_name      TEXT NOT NULL,
+    brand          TEXT NOT NULL COLLATE NOCASE,
+    retailer       TEXT NOT NULL COLLATE NOCASE,
+    price          INTEGER,
+    currency       TEXT,
+    thumbnail      TEXT,
+    scraped_at     TEXT NOT NULL,
+    item           TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_canonical_id ON items (canonical_id);
+CREATE INDEX IF NOT EXISTS items_brand        ON items (brand);
+CREATE INDEX IF NOT EXISTS items_retailer     ON items (retailer);
+CREATE INDEX IF NOT EXISTS items_scraped_at   ON items (scraped_at);
+"""
+
+_UPSERT = """
+INSERT INTO items (url, canonical_id, shoe_name, brand, retailer, price, currency,
+                   thumbnail, scraped_at, item)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (url) DO UPDATE SET
+    canonical_id = excluded.canonical_id, shoe_name = excluded.shoe_name,
+    brand = excluded.brand, retailer = excluded.retailer, price = excluded.price,
+    currency = excluded.currency, thumbnail = excluded.thumbnail,
+    scraped_at = excluded.scraped_at, item = excluded.item
+"""
+
+
+def _row(item: dict, scraped_at: str) -> tuple:
+    name = item.get("shoeName") or ""
+    brand = item.get("brand") or ""
+    return (
+        item["url"],
+        make_canonical_id(normalize_canonical(name), brand),
+        name,
+        brand,
+        resolve_retailer(item["url"]),
+        item.get("retailPrice"),
+        item.get("currency"),
+        item.get("thumbnail"),
+        scraped_at,
+        json.dumps(item, ensure_ascii=False),
+    )
+
+
+class CatalogStore:
+    """Upsert and query the catalog. One SQLite connection per thread, so a
+    store can be shared by the result-writer thread and the main thread."""
+
+    def __init__(self, path: str = CATALOG_DB):
+        self.path = path
+        self._local = threading.local()
+        self._conn()  # create the schema up front
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def put_many(self, items, scraped_at: str = None) -> int:
+        """Upsert items (keyed by URL) in one transaction. Returns how many were written."""
+        stamp = scraped_at or datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+        rows = [_row(item, stamp) for item in items if item.get("url")]
+        if rows:
+            conn = self._conn()
+            with conn:
+                conn.executemany(_UPSERT, rows)
+        return len(rows)
+
+    def query(self, brand: str = None, retailer: str = None, since: str = None,
+              canonical_id: str = None):
+        """Yield stored items, newest scrape first. `since` is an ISO date or datetime (UTC)."""
+        where, args = [], []
+        for column, value in (("brand", brand), ("retailer", retailer),
+                              ("canonical_id", canonical_id)):
+            if value:
+                where.append(f"{column} = ?")   # brand / retailer compare case-insensitively
+                args.append(value)
+        if since:
+            where.append("scraped_at >= ?")
+            args.append(since)
+        sql = "SELECT item FROM items"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY scraped_at DESC"
+        for (raw,) in self._conn().execute(sql, args):
+            yield json.loads(raw)
+
+    def stats(self) -> dict:
+        conn = self._conn()
+        total, latest = conn.execute("SELECT COUNT(*), MAX(scraped_at) FROM items").fetchone()
+        by_retailer = dict(conn.execute(
+            "SELECT retailer, COUNT(*) FROM items GROUP BY retailer ORDER BY COUNT(*) DESC"))
+        return {"items": total, "latest": latest, "by_retailer": by_retailer}
+
+    def export_jsonl(self, path: str, **filters) -> int:
+        """Write matching items to `path`, one JSON object per line. Returns the count."""
+        n = 0
+        with open(path, "w", encoding="utf-8") as f:
+            for item in self.query(**filters):
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+                n += 1
+        return n
+
+    def import_dump(self, path: str) -> int:
+        """Load an old sneaker_dump.txt (indented JSON objects joined by ',\\n')."""
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read().strip().rstrip(",")
+        if not text:
+            return 0
+        return self.put_many(json.loads(f"[{text}]"))
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _flags(args: list) -> dict:
+    """['--brand', 'Nike', '--since=2026-10-01'] → {'brand': 'Nike', 'since': '2026-10-01'}."""
+    out, it = {}, iter(args)
+    for a in it:
+        if a.startswith("--"):
+            key, _, value = a[2:].partition("=")
+            out[key] = value or next(it, "")
+    return out
+
+
+def main(argv: list) -> None:
+    cmd = argv[0] if argv else "stats"
+    store = CatalogStore()
+    if cmd == "stats":
+        s = store.stats()
+        print(f"📚 {store.path}: {s['items']} items, last scraped {s['latest'] or 'never'}")
+        for retailer, n in s["by_retailer"].items():
+            print(f"   {retailer:<20} {n}")
+    elif cmd == "export" and len(argv) > 1:
+        flags = _flags(argv[2:])
+        n = store.export_jsonl(argv[1], brand=flags.get("brand"), retailer=flags.get("retailer"),
+                               since=flags.get("since"))
+        print(f"✅ Exported {n} items to {argv[1]}")
+    elif cmd == "import-dump" and len(argv) > 1:
+        print(f"✅ Imported {store.import_dump(argv[1])} items from {argv[1]}")
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,187 @@
+"""
+crawl_scheduler.py — Host-interleaved work scheduler for batch scrapes.
+
+Link files are grouped by store, so handing URLs out in file order hits one
+retailer back-to-back while every worker sleeps its politeness delay. The
+scheduler instead gives each host a token bucket and hands a worker the next
+URL from whichever host has a token free, so one store's delay is spent
+scraping another store:
+
+  • a host's bucket holds `per_host` tokens (the old per-host semaphore); a
+    request takes one, and it comes back `delay` seconds after the request
+    finishes — the same gap the old sleep after each page gave that store
+  • robots.txt Crawl-delay / Request-rate raise a host's delay, and a host
+    with a Crawl-delay is only sent one request at a time
+  • a Retry-After from a 429/503 (see retry_after()) pauses the host
+  • stop() (e.g. on Ctrl-C) makes next() return None at once, so workers
+    finish the URL in hand and exit
+
+    sched = CrawlScheduler(urls, per_host=2, delay=2)
+    while (job := sched.next()) is not None:
+        pos, url = job
+        try: ...
+        finally: sched.done(url)
+"""
+
+import email.utils
+import threading
+import time
+import urllib.robotparser
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import urlparse
+
+import http_client
+
+ROBOTS_TIMEOUT   = 5     # seconds per robots.txt fetch
+ROBOTS_AGENT     = "*"   # robots.txt group to obey
+MAX_RETRY_AFTER  = 300   # cap on how long one Retry-After may pause a host, seconds
+
+_cooldown: dict = {}     # host → time.monotonic() before which it gets no requests
+_cooldown_lock = threading.Lock()
+
+
+def host_key(url: str) -> str:
+    return (urlparse(url).hostname or "").lower().replace("www.", "")
+
+
+# ── robots.txt ────────────────────────────────────────────────────────────────
+@lru_cache(maxsize=None)
+def robots_delay(origin: str) -> float:
+    """Seconds robots.txt at `origin` (scheme://host) asks between requests, 0 if none.
+    Takes the larger of Crawl-delay and Request-rate. Unreachable robots.txt → 0."""
+    try:
+        body = http_client.get(f"{origin}/robots.txt", timeout=ROBOTS_TIMEOUT).body
+    except Exception:
+        return 0.0
+    rp = urllib.robotparser.RobotFileParser()
+    rp.parse(body.decode("utf-8", "replace").splitlines())
+    delay = float(rp.crawl_delay(ROBOTS_AGENT) or 0)
+    rate = rp.request_rate(ROBOTS_AGENT)
+    if rate and rate.requests:
+        delay = max(delay, rate.seconds / rate.requests)
+    return delay
+
+
+# ── Retry-After ───────────────────────────────────────────────────────────────
+def _retry_after_seconds(value) -> float:
+    """Retry-After is either delta-seconds or an HTTP date."""
+    value = str(value or "").strip()
+    if not value:
+        return 0.0
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return when.timestamp() - time.time()
+
+
+def retry_after(url: str, value) -> float:
+    """Record a Retry-After header value for url's host. Returns the pause in seconds."""
+    seconds = min(max(_retry_after_seconds(value), 0.0), MAX_RETRY_AFTER)
+    if seconds:
+        host = host_key(url)
+        with _cooldown_lock:
+            _cooldown[host] = max(_cooldown.get(host, 0.0), time.monotonic() + seconds)
+        print(f"   ⏳ {host} asked us to back off — pausing it for {seconds:.0f}s")
+    return seconds
+
+
+def cooldown_left(url: str) -> float:
+    """Seconds until url's host may be requested again after a Retry-After."""
+    with _cooldown_lock:
+        return max(0.0, _cooldown.get(host_key(url), 0.0) - time.monotonic())
+
+
+# ── Scheduler ─────────────────────────────────────────────────────────────────
+class _HostBucket:
+    def __init__(self, tokens: int, delay: float):
+        self.tokens = tokens
+        self.delay = delay
+        self.returns: list = []        # monotonic times at which spent tokens come back
+        self.pending: deque = deque()  # (pos, url) not handed out yet, in input order
+
+    def ready_at(self, host: str, now: float) -> float:
+        self.returns.sort()
+        while self.returns and self.returns[0] <= now:
+            self.returns.pop(0)
+            self.tokens += 1
+        if self.tokens > 0:
+            at = now
+        elif self.returns:
+            at = self.returns[0]
+        else:
+            return float("inf")        # every token is out on a request still running
+        with _cooldown_lock:
+            return max(at, _cooldown.get(host, 0.0))
+
+
+class CrawlScheduler:
+    """Hands out (pos, url) from `urls` across hosts, each paced by its own bucket.
+    Thread-safe; every URL returned by next() must be passed back to done()."""
+
+    def __init__(self, urls, per_host: int = 1, delay: float = 0):
+        self._buckets: dict = {}
+        origins: dict = {}
+        for pos, url in enumerate(urls):
+            host = host_key(url)
+            if host not in self._buckets:
+                self._buckets[host] = _HostBucket(per_host, delay)
+                parts = urlparse(url)
+                origins[host] = f"{parts.scheme}://{parts.netloc}"
+            self._buckets[host].pending.append((pos, url))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            robots = dict(zip(origins, pool.map(robots_delay, origins.values())))
+        for host, crawl_delay in robots.items():
+            if crawl_delay > 0:
+                b = self._buckets[host]
+                b.tokens = 1
+                b.delay = max(delay, crawl_delay)
+                print(f"   🤖 {host}: robots.txt asks for {crawl_delay:g}s between requests")
+
+        self._order = deque(self._buckets)   # round-robin, so hosts interleave fairly
+        self._remaining = len(urls)
+        self._cond = threading.Condition()
+        self.stopped = threading.Event()
+
+    def next(self):
+        """(pos, url) for the next request, waiting until some host may be hit.
+        None once every URL has been handed out, or once stop() was called."""
+        with self._cond:
+            while True:
+                if self._remaining == 0 or self.stopped.is_set():
+                    return None
+                now = time.monotonic()
+                soonest = float("inf")
+                for _ in range(len(self._order)):
+                    host = self._order[0]
+                    self._order.rotate(-1)
+                    b = self._buckets[host]
+                    if not b.pending:
+                        continue
+                    at = b.ready_at(host, now)
+                    if at <= now:
+                        b.tokens -= 1
+                        self._remaining -= 1
+                        return b.pending.popleft()
+                    soonest = min(soonest, at)
+                # wake when the soonest token returns, or when done() / stop() notifies
+                self._cond.wait(None if soonest == float("inf") else soonest - now)
+
+    def done(self, url: str) -> None:
+        """The request for `url` finished; its host's token returns after the delay."""
+        with self._cond:
+            b = self._buckets.get(host_key(url))
+            if b is not None:
+                b.returns.append(time.monotonic() + b.delay)
+            self._cond.notify_all()
+
+    def stop(self) -> None:
+        """Hand out no more URLs; every next() waiting or still to come returns None."""
+        with self._cond:
+            self.stopped.set()
+            self._cond.notify_all()
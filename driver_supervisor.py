@@ -0,0 +1,162 @@
+"""
+driver_supervisor.py — Keeps a long-running headless Chrome healthy.
+
+A DriverSupervisor owns one WebDriver for the length of a batch:
+
+  • recycles it every RECYCLE_EVERY pages, or sooner when Chrome's memory
+    (chromedriver + every browser process, measured with psutil if it is
+    installed) passes MAX_RSS_MB
+  • when a page fails because the session died (Chrome crashed, window gone,
+    chromedriver unreachable), starts a fresh browser and retries that URL
+
+    browser = DriverSupervisor(setup_driver)
+    item = browser.run(scrape_single_product, url)
+    browser.close()
+
+SNEAKER_RECYCLE_EVERY and SNEAKER_MAX_RSS_MB override the defaults (0 disables).
+"""
+
+import os
+
+from selenium.common.exceptions import (
+    InvalidSessionIdException, NoSuchWindowException, WebDriverException,
+)
+
+try:
+    import psutil
+except ImportError:  # optional — without it only the page-count limit applies
+    psutil = None
+
+RECYCLE_EVERY   = int(os.environ.get("SNEAKER_RECYCLE_EVERY", "250"))   # pages per browser
+MAX_RSS_MB      = int(os.environ.get("SNEAKER_MAX_RSS_MB", "1500"))     # whole Chrome process tree
+RSS_CHECK_EVERY = 10   # pages between memory checks
+RESTART_RETRIES = 1    # times an in-flight URL is retried on a fresh browser
+
+# WebDriverException messages that mean the browser/session is gone for good
+# ("disconnected:" with its colon — bare "disconnected" also matches net::ERR_INTERNET_DISCONNECTED,
+# a page load failure that leaves the session usable)
+_DEAD_SESSION_MARKERS = (
+    "invalid session id", "session deleted", "chrome not reachable",
+    "disconnected:", "target window already closed", "no such window",
+    "tab crashed",
+)
+
+
+def is_dead_session(exc: BaseException) -> bool:
+    """True if `exc` means the WebDriver session can't be used any more."""
+    if isinstance(exc, (InvalidSessionIdException, NoSuchWindowException)):
+        return True
+    if isinstance(exc, WebDriverException):
+        msg = (exc.msg or "").lower()
+        return any(m in msg for m in _DEAD_SESSION_MARKERS)
+    # chromedriver itself died — the HTTP connection to it is refused/reset
+    return isinstance(exc, ConnectionError) or type(exc).__name__ in (
+        "MaxRetryError", "ProtocolError", "NewConnectionError",
+    )
+
+
+def browser_rss_mb(driver):
+    """Resident memory of chromedriver and all its children in MB, or None if unknown."""
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        procs = [root] + root.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return None
+    total = 0
+    for p in procs:
+        try:
+            total += p.memory_info().rss
+        except psutil.Error:
+            pass  # exited between listing and measuring
+    return total / (1024 * 1024)
+
+
+class DriverSupervisor:
+    """Lazily started, periodically recycled, self-healing WebDriver."""
+
+    def __init__(self, factory, name: str = "", recycle_every: int = RECYCLE_EVERY,
+                 max_rss_mb: int = MAX_RSS_MB):
+        self.factory = factory
+        self.name = name
+        self.recycle_every = recycle_every
+        self.max_rss_mb = max_rss_mb
+        self.restarts = 0
+        self._driver = None
+        self._pages = 0
+
+    @property
+    def driver(self):
+        """The current WebDriver, starting Chrome if needed. Raises if it won't start."""
+        if self._driver is None:
+            self._driver = self.factory()
+            self._pages = 0
+        return self._driver
+
+    def run(self, fn, url):
+        """fn(driver, url) on the supervised driver. If the session dies mid-page,
+        restart Chrome and retry the URL; other exceptions propagate unchanged."""
+        for attempt in range(RESTART_RETRIES + 1):
+            driver = self.driver
+            try:
+                result = fn(driver, url)
+            except Exception as e:
+                if attempt < RESTART_RETRIES and (is_dead_session(e) or not self._alive()):
+                    print(f"   ♻️  {self._label()}Chrome session lost ({type(e).__name__}) "
+                          f"— restarting and retrying {url[:60]}")
+                    self.restart()
+                    continue
+                raise
+            self._after_page()
+            return result
+
+    def restart(self) -> None:
+        """Quit the current browser; the next use starts a fresh one."""
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except Exception:
+                pass
+            self._driver = None
+            self.restarts += 1
+
+    def close(self) -> None:
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except Exception:
+                pass
+            self._driver = None
+
+    def _label(self) -> str:
+        return f"{self.name}: " if self.name else ""
+
+    def _alive(self) -> bool:
+        try:
+            self._driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _after_page(self) -> None:
+        self._pages += 1
+        if self.recycle_every and self._pages >= self.recycle_every:
+            print(f"   ♻️  {self._label()}Recycling Chrome after {self._pages} pages")
+            self.restart()
+        elif self.max_rss_mb and self._pages % RSS_CHECK_EVERY == 0:
+            rss = browser_rss_mb(self._driver)
+            if rss is not None and rss > self.max_rss_mb:
+                print(f"   ♻️  {self._label()}Recycling Chrome at {rss:.0f} MB "
+                      f"(limit {self.max_rss_mb} MB) after {self._pages} pages")
+                self.restart()
+
+
+def supervise(driver_or_supervisor, factory):
+    """Wrap a bare WebDriver so callers can pass either. A wrapped driver is adopted:
+    it may be quit and replaced by factory() when recycled."""
+    if isinstance(driver_or_supervisor, DriverSupervisor):
+        return driver_or_supervisor
+    sup = DriverSupervisor(factory)
+    sup._driver = driver_or_supervisor
+    return sup
@@ -0,0 +1,131 @@
+"""
+extract_adapters.py — Per-host shortcuts through the extractor fallback chains.
+
+sneaker_bot extracts each field by walking a chain of stages (GTM data layer,
+JSON-LD, meta tags, CSS selectors, body text ...) until one hits. Every store
+resolves a field at the same stage page after page, so each host remembers
+which stage won on its recent pages (kept in ADAPTER_STATS_FILE). Once one
+stage has won MIN_SHARE of the last HISTORY_SIZE pages, extraction tries that
+stage first and only walks the generic chain when it misses.
+
+ADAPTERS seeds hosts whose winning stages are known before any history exists.
+
+The stats are saved every SAVE_EVERY pages during a batch, and a process that
+only reads them (a parse worker) reloads the file when it changes, at most
+every RELOAD_INTERVAL seconds — so what the batch learns reaches the workers
+while it is still running.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+ADAPTER_STATS_FILE = ".extract_stats.json"
+HISTORY_SIZE       = 50    # winning stages kept per host and field
+MIN_SAMPLES        = 10    # pages seen before a learned stage is trusted
+MIN_SHARE          = 0.9   # fraction of those pages the stage must have won
+MISS               = ""    # recorded when no precise stage found the field
+SAVE_EVERY         = 25    # pages recorded between saves during a batch
+RELOAD_INTERVAL    = 10.0  # seconds between stats-file checks in read-only processes
+
+# Stages that read a field the store states explicitly. Only these are learned: the
+# catch-all fallbacks (css_generic, body_text, title, img_width) return *something* on
+# nearly every page, so once tried first they would keep winning with a wrong value.
+PRECISE_STAGES = frozenset({"gtm", "ld_json", "meta", "og_title", "og_image", "css"})
+
+# host → {field: stage} — known-good stages used until a host has its own history.
+# The Shopify stores carry JSON-LD offers plus og: tags, but no GTM data layer, which
+# every chain tries first. (VegNonVeg's GTM layer already leads, so it needs no seed.)
+_SHOPIFY = {"name": "og_title", "price": "ld_json", "image": "og_image"}
+ADAPTERS = {
+    "crepdogcrew.com":              _SHOPIFY,
+    "marketplace.mainstreet.co.in": _SHOPIFY,
+    "superkicks.in":                _SHOPIFY,
+    "limitededt.in":                _SHOPIFY,
+}
+
+_lock = threading.Lock()
+_stats: dict = {}
+_loaded = False
+_mtime = None       # stats file mtime when last read
+_checked = 0.0      # time.monotonic() of the last mtime check
+_recorded = 0       # pages recorded by this process (it then owns the stats)
+
+
+def _host(url: str) -> str:
+    return (urlparse(url).hostname or "").replace("www.", "")
+
+
+def _load() -> None:
+    """Read the stats file once; in a process that records nothing, re-read it when it changes."""
+    global _loaded, _mtime, _checked
+    if _loaded and (_recorded or time.monotonic() - _checked < RELOAD_INTERVAL):
+        return
+    _checked = time.monotonic()
+    try:
+        mtime = os.stat(ADAPTER_STATS_FILE).st_mtime
+        if mtime != _mtime:
+            with open(ADAPTER_STATS_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            _stats.clear()
+            _stats.update(data)
+            _mtime = mtime
+    except (FileNotFoundError, ValueError):
+        pass
+    _loaded = True
+
+
+def preferred(url: str, field: str):
+    """The stage to try first for `field` on url's host, or None to walk the generic chain."""
+    host = _host(url)
+    if not host:
+        return None
+    with _lock:
+        _load()
+        history = list(_stats.get(host, {}).get(field, ()))
+    if len(history) < MIN_SAMPLES:
+        return ADAPTERS.get(host, {}).get(field)
+    stage, wins = Counter(history).most_common(1)[0]
+    if stage in PRECISE_STAGES and wins >= MIN_SHARE * len(history):
+        return stage
+    return None
+
+
+def record(url: str, stages: dict) -> None:
+    """Add one page's winning stage per field ({field: stage}) for url's host.
+    A field resolved only by a fallback stage is recorded as a MISS.
+    Every SAVE_EVERY pages the stats are saved, for the parse workers to pick up."""
+    global _recorded
+    host = _host(url)
+    if not host or not stages:
+        return
+    with _lock:
+        _load()
+        _recorded += 1
+        fields = _stats.setdefault(host, {})
+        for field, stage in stages.items():
+            history = fields.setdefault(field, [])
+            history.append(stage if stage in PRECISE_STAGES else MISS)
+            del history[:-HISTORY_SIZE]
+        if _recorded % SAVE_EVERY == 0:
+            _save()
+
+
+def save_stats() -> None:
+    """Persist learned per-host winning stages (call at the end of a batch)."""
+    with _lock:
+        _save()
+
+
+def _save() -> None:
+    global _mtime
+    if not _stats:
+        return
+    tmp = ADAPTER_STATS_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(_stats, f)
+    os.replace(tmp, ADAPTER_STATS_FILE)
+    _mtime = os.stat(ADAPTER_STATS_FILE).st_mtime
@@ -16,43 +16,11 @@ Run after all scraping is complete:
   MONGODB_URI="..." python3 fix_nb_models.py
 """
 
-import os, re, hashlib, unicodedata
+import os, re
 from pymongo import MongoClient
 
-# ── Mirrors normalize_canonical() in sneaker_bot.py (FIXED version) ──────────
-_BRAND_PREFIXES = [
-    r'^nike\s+', r'^adidas\s+', r'^new balance\s+', r'^jordan brand\s+',
-    r'^converse\s+', r'^reebok\s+', r'^asics\s+', r'^puma\s+',
-    r'^vans\s+', r'^on running\s+', r'^hoka one one\s+', r'^hoka\s+',
-    r'^salomon\s+', r'^ugg\s+',
-]
-_NOISE_WORDS = {
-    'the', 'and', 'with', 'for', 'by', 'in', 'a', 'an',
-    'retro', 'og',
-    'gs', 'ps', 'td', 'bp', 'preschool', 'gradeschool', 'toddler',
-}
-
-def normalize_canonical(name: str) -> str:
-    s = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
-    s = s.lower()
-    for pat in _BRAND_PREFIXES:
-        s = re.sub(pat, '', s, count=1)
-    # FIXED: require ≥1 letter prefix so 1000/9060/2002 are NOT stripped
-    s = re.sub(r'\b[a-z]{1,3}\d{4,6}(?:-\d{3})?\b', '', s)
-    s = re.sub(r'\b\d{4,6}-\d{3}\b', '', s)
-    # Digits-first codes like 162053c (5+ digits so NB 2002R/1906D are preserved)
-    s = re.sub(r'\b\d{5,6}[a-z]{1,2}\b', '', s)
-    s = re.sub(r'\([^)]*\)', '', s)
-    s = re.sub(r'\[[^\]]*\]', '', s)
-    s = s.replace("'", '').replace('"', '')
-    s = re.sub(r'[^a-z0-9\s]', ' ', s)
-    s = re.sub(r'\s+', ' ', s).strip()
-    tokens = [t for t in s.split() if t and t not in _NOISE_WORDS]
-    return ' '.join(tokens)
-
-def make_canonical_id(canonical: str, brand: str) -> str:
-    key = f"{brand.lower().strip()}||{canonical}"
-    return 'c_' + hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+# Same canonicalization the scraper uses, so rebuilt _ids match what it writes
+from canonical import make_canonical_id, normalize_canonical
 
 def extract_nb_model(url: str) -> str | None:
     """Pull the NB model number out of a product URL slug.
@@ -27,6 +27,10 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+import lean_browser
+import page_ready
+import shoe_filter
+
 # ── Config ───────────────────────────────────────────────────────────────────
 BASE_URL   = "https://www.footlocker.co.in"
 OUTPUT     = "footlocker_links.txt"
@@ -47,52 +51,8 @@ CATEGORIES = [
     },
 ]
 
-PAGE_LOAD_WAIT = 5   # seconds after page load before reading links
 MAX_PAGES      = 50  # safety cap per category
 
-# ── Non-shoe filter (same as other extractors) ────────────────────────────────
-_NON_SHOE_EXACT = {
-    "tee", "tees", "shirt", "shirts", "hoodie", "hoodies", "sweatshirt",
-    "crewneck", "polo", "cardigan", "sweater", "jumper", "fleece", "vest",
-    "pullover", "jersey", "pant", "pants", "legging", "leggings",
-    "jogger", "joggers", "sweatpant", "sweatpants", "short", "shorts",
-    "jacket", "jackets", "windbreaker", "anorak", "coat", "bomber",
-    "dress", "skirt", "romper", "bodysuit", "swimsuit", "bra", "top", "tops",
-    "cap", "caps", "hat", "hats", "beanie", "beanies", "headband",
-    "bag", "bags", "backpack", "tote", "wallet", "keychain", "belt",
-    "glasses", "sunglasses", "sock", "socks", "insole", "insoles", "laces",
-    "spray", "cleaner", "brush", "kit", "protector",
-    "giftcard", "voucher",
-}
-
-_NON_SHOE_SUBSTR = (
-    "-cap", "bucket-hat", "trucker-cap", "-beanie",
-    "shoelace", "-lace-", "-laces-", "-insole",
-    "-bag", "tote-bag", "-backpack",
-    "-sock-", "-socks-", "-sock", "-socks",
-    "-spray", "shoe-care",
-    "track-top", "track-jacket",
-    "gift-card", "e-gift",
-    "-keychain", "-wallet",
-)
-
-_NON_SHOE_SUFFIXES = (
-    "-cap", "-hat", "-socks", "-sock", "-bag", "-backpack",
-    "-tee", "-hoodie", "-jacket", "-shorts", "-pant", "-pants",
-    "-jersey", "-polo", "-vest", "-laces", "-insole", "-spray", "-kit",
-)
-
-
-def _is_non_shoe(slug: str) -> bool:
-    s = slug.lower().split("?")[0]
-    if s.endswith(_NON_SHOE_SUFFIXES):
-        return True
-    words = set(s.replace("_", "-").split("-"))
-    if words & _NON_SHOE_EXACT:
-        return True
-    return any(kw in s for kw in _NON_SHOE_SUBSTR)
-
-
 # ── Browser setup ─────────────────────────────────────────────────────────────
 def make_driver() -> webdriver.Chrome:
     opts = Options()
@@ -107,7 +67,9 @@ def make_driver() -> webdriver.Chrome:
     # Reduce bot fingerprint
     opts.add_experimental_option("excludeSwitches", ["enable-automation"])
     opts.add_experimental_option("useAutomationExtension", False)
+    lean_browser.apply_options(opts)
     driver = webdriver.Chrome(options=opts)
+    lean_browser.enable(driver)
     driver.execute_cdp_cmd(
         "Page.addScriptToEvaluateOnNewDocument",
         {"source": "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"}
@@ -161,8 +123,8 @@ def scrape_category(driver: webdriver.Chrome, name: str, base_url: str) -> list[
     while page <= MAX_PAGES:
         url = f"{base_url}?p={page}&f=sort%3Dlow-to-high"
         print(f"    Page {page} ...", end=" ", flush=True)
-        driver.get(url)
-        time.sleep(PAGE_LOAD_WAIT)
+        lean_browser.get(driver, url)
+        page_ready.wait_until_ready(driver, url, page_ready.PRODUCT_LINKS_READY_JS)
 
         links = get_product_links(driver)
         if not links:
@@ -198,20 +160,10 @@ def main():
             all_links.extend(links)
     finally:
         driver.quit()
+        page_ready.save_stats()
 
     # Deduplicate + filter
-    seen: set[str] = set()
-    footwear: list[str] = []
-    filtered_out = 0
-    for u in all_links:
-        if u in seen:
-            continue
-        seen.add(u)
-        slug = u.split("/products/")[-1]
-        if _is_non_shoe(slug):
-            filtered_out += 1
-        else:
-            footwear.append(u)
+    footwear, filtered_out = shoe_filter.split_footwear(all_links)
 
     with open(OUTPUT, "w", encoding="utf-8") as f:
         f.write("# Foot Locker India footwear URLs — extracted via Selenium\n")
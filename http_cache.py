@@ -0,0 +1,178 @@
+"""
+http_cache.py — Conditional-GET cache for sitemap fetches.
+
+Each URL gets one entry under CACHE_DIR:
+    <key>.json     validators (ETag / Last-Modified), body SHA-256, parsed result
+    <key>.body.gz  last response body
+
+open_url() sends If-None-Match / If-Modified-Since from the stored validators.
+On a 304 the response is flagged `unchanged` straight away, and callers reuse
+the stored parse via parsed() instead of downloading the document again. A 200
+is streamed: the body is hashed and written to the cache while the caller reads
+it, so a large sitemap is never held in memory whole. Servers that send no
+validators answer 200 every time; save() downloads such a body into the cache
+first, so an unchanged hash is known before anything is parsed.
+"""
+
+import contextlib
+import gzip
+import hashlib
+import json
+import os
+import threading
+import urllib.error
+
+import http_client
+
+CACHE_DIR = ".http_cache"
+PARSE_VERSION = 1  # bump when the sitemap parser changes, to invalidate stored parses
+
+
+def _key(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def _meta_path(url: str) -> str:
+    return os.path.join(CACHE_DIR, _key(url) + ".json")
+
+
+def _body_path(url: str) -> str:
+    return os.path.join(CACHE_DIR, _key(url) + ".body.gz")
+
+
+def _load_meta(url: str) -> dict:
+    try:
+        with open(_meta_path(url), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        return meta if isinstance(meta, dict) and meta.get("url") == url else {}
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_meta(url: str, meta: dict) -> None:
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _meta_path(url)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(path + ".tmp", path)
+
+
+def _iter_stored_body(url: str):
+    try:
+        with gzip.open(_body_path(url), "rb") as f:
+            while True:
+                chunk = f.read(http_client.CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+    except (FileNotFoundError, OSError, EOFError):
+        return
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class Fetch:
+    """An open conditional GET; read the body with chunks().
+
+    On a 304 `unchanged` and `digest` are known up front and chunks() replays
+    the stored body. On a 200 they are set once chunks() or save() has run to
+    the end; after that chunks() replays the cached copy."""
+
+    def __init__(self, url: str, meta: dict, have_body: bool, stream=None):
+        self.url = url
+        self.unchanged = stream is None
+        self.digest = meta.get("sha256") if stream is None else None
+        self._meta = meta
+        self._have_body = have_body
+        self._stream = stream
+
+    def chunks(self):
+        """Yield the decoded body as it arrives, hashing and caching it on the way."""
+        if self._stream is None or self.digest is not None:
+            yield from _iter_stored_body(self.url)
+            return
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        path = _body_path(self.url)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        hasher = hashlib.sha256()
+        try:
+            with gzip.open(tmp, "wb") as f:
+                for chunk in self._stream.iter_chunks():
+                    hasher.update(chunk)
+                    f.write(chunk)
+                    yield chunk
+        except BaseException:
+            _remove(tmp)   # partial body — keep the previous one
+            raise
+        self._finish(hasher.hexdigest(), tmp, path)
+
+    def save(self) -> None:
+        """Download the whole body into the cache without handing it out, so
+        `unchanged` and `digest` are set before the caller reads anything."""
+        if self.digest is None:
+            for _ in self.chunks():
+                pass
+
+    def _finish(self, digest: str, tmp: str, path: str) -> None:
+        self.digest = digest
+        self.unchanged = self._have_body and digest == self._meta.get("sha256")
+        if self.unchanged:
+            _remove(tmp)
+            meta = self._meta
+        else:
+            os.replace(tmp, path)
+            meta = {"url": self.url, "sha256": digest}
+        headers = self._stream.headers
+        meta["etag"], meta["last_modified"] = headers.get("ETag"), headers.get("Last-Modified")
+        _save_meta(self.url, meta)
+
+
+@contextlib.contextmanager
+def open_url(url: str, headers: dict, timeout: float):
+    """Conditional GET over the shared http_client pool, yielding a Fetch:
+
+        with http_cache.open_url(url, headers, timeout) as resp:
+            if resp.unchanged: ...            # 304 — parsed(url, resp.digest)
+            for chunk in resp.chunks(): ...
+
+    Raises urllib.error.HTTPError for anything but 2xx/304."""
+    meta = _load_meta(url)
+    req_headers = dict(headers)
+    have_body = bool(meta.get("sha256")) and os.path.exists(_body_path(url))
+    if have_body:
+        if meta.get("etag"):
+            req_headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            req_headers["If-Modified-Since"] = meta["last_modified"]
+
+    with contextlib.ExitStack() as stack:
+        try:
+            stream = stack.enter_context(http_client.stream(url, req_headers, timeout))
+        except urllib.error.HTTPError as e:
+            if e.code != 304 or not have_body:
+                raise
+            stream = None
+        yield Fetch(url, meta, have_body, stream)
+
+
+def parsed(url: str, digest: str):
+    """Stored parse result for this exact body, or None."""
+    meta = _load_meta(url)
+    p = meta.get("parsed")
+    if isinstance(p, dict) and p.get("sha256") == digest and p.get("version") == PARSE_VERSION:
+        return p.get("data")
+    return None
+
+
+def store_parsed(url: str, digest: str, data) -> None:
+    """Remember the parse of the body with hash `digest` (must be JSON-serialisable)."""
+    meta = _load_meta(url)
+    if meta.get("sha256") != digest:
+        return
+    meta["parsed"] = {"sha256": digest, "version": PARSE_VERSION, "data": data}
+    _save_meta(url, meta)
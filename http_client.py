@@ -0,0 +1,242 @@
+"""
+http_client.py — Shared pooled HTTP client for every plain-HTTP fetch.
+
+Used by sitemap_engine / http_cache (sitemaps) and sneaker_bot's Shopify .js
+fast path, instead of a fresh urllib.request.urlopen per request:
+
+  • keep-alive connections, pooled per host and reused across threads, so a
+    store's sitemaps and product JSON share one TCP + TLS handshake
+  • asks for compressed bodies (gzip, deflate, and br when the optional
+    `brotli` package is installed) and decodes them transparently
+  • at most MAX_PER_HOST requests in flight per host
+  • follows redirects; raises urllib.error.HTTPError for other non-2xx statuses
+    (including 304), so callers' existing except clauses keep working
+
+    resp = http_client.get(url, headers, timeout=10)
+    resp.status, resp.headers.get("ETag"), resp.body
+
+    with http_client.stream(url, headers) as resp:    # large bodies, read incrementally
+        for chunk in resp.iter_chunks(): ...
+"""
+
+import contextlib
+import http.client
+import ssl
+import threading
+import urllib.error
+import zlib
+from urllib.parse import urljoin, urlsplit
+
+try:
+    import brotli
+except ImportError:  # optional — without it we just don't advertise br
+    brotli = None
+
+DEFAULT_TIMEOUT   = 15   # seconds, per request
+MAX_PER_HOST      = 4    # concurrent requests per host
+MAX_IDLE_PER_HOST = 4    # idle keep-alive connections kept per host
+MAX_REDIRECTS     = 5
+CHUNK_SIZE        = 64 * 1024   # bytes per read when streaming
+
+ACCEPT_ENCODING = "gzip, deflate" + (", br" if brotli is not None else "")
+
+_SSL_CONTEXT = ssl.create_default_context()
+_REDIRECTS = (301, 302, 303, 307, 308)
+# Errors meaning a pooled keep-alive connection was closed by the server while idle
+_STALE = (http.client.RemoteDisconnected, http.client.BadStatusLine,
+          ConnectionResetError, BrokenPipeError, ConnectionAbortedError)
+
+
+class Response:
+    def __init__(self, url: str, status: int, headers, body: bytes):
+        self.url = url            # final URL, after redirects
+        self.status = status
+        self.headers = headers    # http.client.HTTPMessage — case-insensitive .get()
+        self.body = body          # already decompressed
+
+
+class _HostPool:
+    """Idle connections and an in-flight limit for one (scheme, host, port)."""
+
+    def __init__(self, scheme: str, netloc: str):
+        self.scheme = scheme
+        self.netloc = netloc
+        self.idle: list = []
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(MAX_PER_HOST)
+
+    def connect(self, timeout: float):
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.netloc, timeout=timeout, context=_SSL_CONTEXT)
+        return http.client.HTTPConnection(self.netloc, timeout=timeout)
+
+    def checkout(self, timeout: float):
+        """(connection, reused) — an idle keep-alive connection if there is one."""
+        with self.lock:
+            conn = self.idle.pop() if self.idle else None
+        if conn is None:
+            return self.connect(timeout), False
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, True
+
+    def checkin(self, conn) -> None:
+        with self.lock:
+            if len(self.idle) < MAX_IDLE_PER_HOST:
+                self.idle.append(conn)
+                return
+        conn.close()
+
+
+_pools: dict = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_for(scheme: str, netloc: str) -> _HostPool:
+    key = (scheme, netloc.lower())
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = _HostPool(scheme, netloc)
+        return pool
+
+
+class _Decoder:
+    """Incremental Content-Encoding decoder (gzip / deflate / br / identity)."""
+
+    def __init__(self, encoding: str):
+        encoding = (encoding or "").strip().lower()
+        self._obj = None
+        self._deflate = encoding == "deflate"   # zlib-wrapped or raw — decided on the first bytes
+        if encoding in ("gzip", "x-gzip"):
+            self._obj = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "br" and brotli is not None:
+            self._obj = brotli.Decompressor()
+        elif encoding not in ("", "identity", "deflate"):
+            raise ValueError(f"unsupported Content-Encoding: {encoding}")
+
+    def feed(self, data: bytes):
+        """Yield the decoded bytes for `data`, at most CHUNK_SIZE at a time for zlib
+        (a highly compressible body can inflate 50x)."""
+        if self._deflate and self._obj is None and len(data) >= 2:
+            zlib_header = data[0] & 0x0F == 8 and (data[0] << 8 | data[1]) % 31 == 0
+            self._obj = zlib.decompressobj(zlib.MAX_WBITS if zlib_header else -zlib.MAX_WBITS)
+        if self._obj is None:
+            yield data
+        elif hasattr(self._obj, "decompress"):
+            while data:
+                yield self._obj.decompress(data, CHUNK_SIZE)
+                data = self._obj.unconsumed_tail
+        else:
+            yield self._obj.process(data)   # brotli
+
+    def flush(self) -> bytes:
+        return self._obj.flush() if hasattr(self._obj, "flush") else b""
+
+
+class StreamResponse:
+    """An open response whose body is read incrementally (see stream())."""
+
+    def __init__(self, url: str, status: int, headers, raw):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.complete = False     # True once the whole body has been read
+        self._raw = raw
+        self._decoder = _Decoder(headers.get("Content-Encoding"))
+
+    def iter_chunks(self, size: int = CHUNK_SIZE):
+        """Yield the decoded body in chunks as it arrives."""
+        while True:
+            data = self._raw.read(size)
+            if not data:
+                break
+            for out in self._decoder.feed(data):
+                if out:
+                    yield out
+        tail = self._decoder.flush()
+        if tail:
+            yield tail
+        self.complete = True
+
+    def read(self) -> bytes:
+        return b"".join(self.iter_chunks())
+
+
+def _open(url: str, headers: dict, timeout: float):
+    """Send one GET on a pooled connection → (pool, connection, HTTPResponse).
+    Holds one of the host's slots until _release()."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        raise ValueError(f"unsupported URL scheme: {url}")
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    pool = _pool_for(parts.scheme, parts.netloc)
+
+    pool.slots.acquire()
+    conn, reused = pool.checkout(timeout)
+    while True:
+        try:
+            conn.request("GET", path, headers=headers)
+            return pool, conn, conn.getresponse()
+        except _STALE:
+            conn.close()
+            if not reused:
+                pool.slots.release()
+                raise
+            # the server dropped this idle connection — retry on a fresh one
+            conn, reused = pool.connect(timeout), False
+        except BaseException:
+            conn.close()
+            pool.slots.release()
+            raise
+
+
+def _release(pool: _HostPool, conn, resp, reusable: bool) -> None:
+    if reusable and not resp.will_close:
+        pool.checkin(conn)
+    else:
+        conn.close()
+    pool.slots.release()
+
+
+@contextlib.contextmanager
+def stream(url: str, headers: dict = None, timeout: float = DEFAULT_TIMEOUT):
+    """GET `url` and yield a StreamResponse whose body is read as it arrives:
+
+        with http_client.stream(url, headers) as r:
+            for chunk in r.iter_chunks(): ...
+
+    The connection goes back to the pool if the body was read to the end.
+    Raises urllib.error.HTTPError for non-2xx statuses, like urllib.request.urlopen."""
+    req_headers = {"Accept-Encoding": ACCEPT_ENCODING}
+    req_headers.update(headers or {})
+
+    for _ in range(MAX_REDIRECTS + 1):
+        pool, conn, resp = _open(url, req_headers, timeout)
+        reusable = False
+        try:
+            status, resp_headers = resp.status, resp.msg
+            location = resp_headers.get("Location")
+            if status in _REDIRECTS and location or not 200 <= status < 300:
+                resp.read()  # drain so the connection can be reused
+                reusable = True
+                if status in _REDIRECTS and location:
+                    url = urljoin(url, location)
+                    continue
+                raise urllib.error.HTTPError(url, status, http.client.responses.get(status, ""), resp_headers, None)
+            sr = StreamResponse(url, status, resp_headers, resp)
+            yield sr
+            reusable = sr.complete
+            return
+        finally:
+            _release(pool, conn, resp, reusable)
+    raise urllib.error.HTTPError(url, status, "too many redirects", resp_headers, None)
+
+
+def get(url: str, headers: dict = None, timeout: float = DEFAULT_TIMEOUT) -> Response:
+    """GET `url` over a pooled keep-alive connection and return the decoded Response.
+    Raises urllib.error.HTTPError for non-2xx statuses, like urllib.request.urlopen."""
+    with stream(url, headers, timeout) as r:
+        body = r.read()
+    return Response(r.url, r.status, r.headers, body)
@@ -0,0 +1,109 @@
+"""
+lean_browser.py — Lean headless Chrome profile shared by the Selenium scrapers.
+
+The scrapers only read meta tags, JSON-LD, inline GTM scripts and image URLs,
+so the browser doesn't need to download images, web fonts, video, analytics
+or chat widgets. This module:
+
+  • switches Chrome to the "eager" page-load strategy (driver.get returns at
+    DOMContentLoaded; page_ready.wait_until_ready polls for the product data)
+  • turns images off in the renderer
+  • blocks the resource and third-party patterns below via CDP Network.setBlockedURLs
+
+Stores that need some of that JS to render product data get a per-host
+ALLOWLIST entry. Set SNEAKER_LEAN=0 to get the full browser back.
+
+    options = Options(); lean_browser.apply_options(options)
+    driver = webdriver.Chrome(options=options); lean_browser.enable(driver)
+    lean_browser.get(driver, url)      # instead of driver.get(url)
+"""
+
+import os
+import weakref
+from urllib.parse import urlparse
+
+LEAN = os.environ.get("SNEAKER_LEAN", "1") != "0"
+
+BLOCKED_EXTENSIONS = (
+    # images — the URL is read from og:image / GTM, never rendered
+    "jpg", "jpeg", "png", "gif", "webp", "avif", "svg", "ico",
+    # web fonts
+    "woff", "woff2", "ttf", "otf", "eot",
+    # video / audio
+    "mp4", "webm", "m3u8", "mp3",
+)
+
+# CDP wildcard patterns, matched against the full request URL (query string included).
+# Each extension is anchored to the end of the path — "*.png*" would also block a page
+# or API URL that merely carries ".png" in a query parameter.
+BLOCKED_RESOURCES = [p for ext in BLOCKED_EXTENSIONS for p in (f"*.{ext}", f"*.{ext}?*")]
+
+BLOCKED_THIRD_PARTY = [
+    # analytics / ads / pixels
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*connect.facebook.net*", "*facebook.com/tr*",
+    "*analytics.tiktok.com*", "*sc-static.net*", "*bat.bing.com*", "*clarity.ms*",
+    "*hotjar.com*", "*static.klaviyo.com*", "*cdn.segment.com*",
+    # chat / support widgets
+    "*tawk.to*", "*widget.intercom.io*", "*static.zdassets.com*", "*gorgias.chat*",
+    "*wchat.freshchat.com*", "*wati.io*", "*interakt.ai*",
+    # embedded video players
+    "*youtube.com/embed*", "*player.vimeo.com*",
+]
+
+# host → patterns that must NOT be blocked there (stores whose product data needs the JS)
+ALLOWLIST = {
+    # Headless Next.js frontend — the GTM data layer carries name/price/brand
+    "vegnonveg.com":    ("*googletagmanager.com*",),
+    # Cloudflare-fronted; keep every script so the challenge page can run
+    "footlocker.co.in": tuple(BLOCKED_THIRD_PARTY),
+}
+
+_applied = weakref.WeakKeyDictionary()   # driver → allowlist host currently applied
+
+
+def apply_options(options) -> None:
+    """Add the lean settings to a ChromeOptions before the driver is created."""
+    if not LEAN:
+        return
+    options.page_load_strategy = "eager"
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+
+def _allowlist_host(url: str) -> str:
+    """The ALLOWLIST key covering url's host (parent domains included), or ''."""
+    host = (urlparse(url).hostname or "").lower()
+    while host:
+        if host in ALLOWLIST:
+            return host
+        host = host.partition(".")[2]
+    return ""
+
+
+def blocked_patterns(url: str = "") -> list:
+    """URL patterns to block while loading `url`."""
+    allowed = set(ALLOWLIST.get(_allowlist_host(url), ()))
+    return [p for p in BLOCKED_RESOURCES + BLOCKED_THIRD_PARTY if p not in allowed]
+
+
+def _set_blocking(driver, key: str, patterns: list) -> None:
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    _applied[driver] = key
+
+
+def enable(driver) -> None:
+    """Turn on request blocking for a freshly created driver."""
+    if not LEAN:
+        return
+    driver.execute_cdp_cmd("Network.enable", {})
+    _set_blocking(driver, "", blocked_patterns())
+
+
+def get(driver, url: str) -> None:
+    """driver.get(url) with the block list for url's host in place."""
+    if LEAN and driver in _applied:
+        key = _allowlist_host(url)
+        if _applied[driver] != key:
+            _set_blocking(driver, key, blocked_patterns(url))
+    driver.get(url)
@@ -0,0 +1,86 @@
+"""
+page_archive.py — Compressed, content-addressed archive of scraped pages.
+
+When SNEAKER_ARCHIVE=1, sneaker_bot stores every page it extracts from (the
+rendered HTML, or the Shopify .js JSON on the fast path) so the catalog can
+later be re-extracted without a browser:
+
+    .page_archive/objects/ab/<sha256>.gz   page body, gzipped; identical pages stored once
+    .page_archive/index.jsonl              {"url": ..., "sha256": ..., "kind": "html", "at": ...}
+
+The index is append-only; the last line for a URL is its current page.
+`python3 sneaker_bot.py --replay` runs these through extraction and the
+normal file/MongoDB save path.
+"""
+
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+ARCHIVE_DIR = ".page_archive"
+
+HTML    = "html"      # rendered page source from Chrome
+SHOPIFY = "shopify"   # body of the Shopify <product-url>.js endpoint
+
+_lock = threading.Lock()
+
+
+def _object_path(digest: str, directory: str) -> str:
+    return os.path.join(directory, "objects", digest[:2], digest + ".gz")
+
+
+def _index_path(directory: str) -> str:
+    return os.path.join(directory, "index.jsonl")
+
+
+def store(url: str, body: str, kind: str = HTML, directory: str = ARCHIVE_DIR) -> str:
+    """Archive one page body for `url`. Returns its SHA-256 digest."""
+    data = body.encode("utf-8")
+    digest = hashlib.sha256(data).hexdigest()
+    path = _object_path(digest, directory)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp, "wb", compresslevel=6) as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    rec = {
+        "url":    url,
+        "sha256": digest,
+        "kind":   kind,
+        "at":     datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+    }
+    with _lock:
+        with open(_index_path(directory), "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec) + "\n")
+    return digest
+
+
+def load(digest: str, directory: str = ARCHIVE_DIR) -> str:
+    """Page body for a digest from the index. Raises FileNotFoundError if missing."""
+    with gzip.open(_object_path(digest, directory), "rb") as f:
+        return f.read().decode("utf-8")
+
+
+def latest(urls=None, directory: str = ARCHIVE_DIR) -> dict:
+    """{url: index record} for the newest archived page of each URL, in first-seen order.
+    Pass `urls` to restrict the result to those URLs."""
+    wanted = set(urls) if urls is not None else None
+    out: dict = {}
+    try:
+        with open(_index_path(directory), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # torn final line from a hard crash
+                url = rec.get("url") if isinstance(rec, dict) else None
+                if url and (wanted is None or url in wanted):
+                    out[url] = rec
+    except FileNotFoundError:
+        pass
+    return out
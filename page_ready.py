@@ -0,0 +1,148 @@
+"""
+page_ready.py — Readiness-based page waits for the Selenium scrapers.
+
+Instead of a fixed sleep after driver.get(), poll the page for the signals the
+extractors actually read (og:title, a JSON-LD Product block, the GTM
+`var product` data layer) and return as soon as one is present.
+
+Each host gets its own timeout, learned from how long its pages took to become
+ready on previous runs (kept in READY_STATS_FILE). Fast stores stop waiting
+early; slow stores get more headroom instead of being skipped. Only waits that
+ended because the signal appeared are learned — a timeout or a page that never
+shows the signal says nothing about how long the store takes. Collection-grid
+waits (PRODUCT_LINKS_READY_JS) are learned apart from product pages.
+"""
+
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import (
+    InvalidSessionIdException, NoSuchWindowException, TimeoutException, WebDriverException,
+)
+from selenium.webdriver.support.ui import WebDriverWait
+
+READY_STATS_FILE = ".ready_stats.json"
+DEFAULT_TIMEOUT  = 10.0  # seconds, for hosts with no history yet
+MIN_TIMEOUT      = 3.0
+MAX_TIMEOUT      = 25.0
+HEADROOM         = 2.0   # timeout = HEADROOM × p95 of past ready times
+HISTORY_SIZE     = 50    # samples kept per host
+NO_SIGNAL_GRACE  = 1.5   # seconds to keep polling after load completes with no signal
+POLL_INTERVAL    = 0.2
+
+# True once any product-data signal is in the DOM
+PRODUCT_READY_JS = """
+const og = document.querySelector("meta[property='og:title']");
+if (og && (og.getAttribute('content') || '').trim().length > 4) return true;
+for (const s of document.querySelectorAll("script[type='application/ld+json']")) {
+  if (s.textContent.indexOf('"Product"') !== -1) return true;
+}
+for (const s of document.scripts) {
+  if (/var product\\s*=|let google\\w+\\s*=/.test(s.textContent)) return true;
+}
+return false;
+"""
+
+# True once product links have rendered (collection / category grids)
+PRODUCT_LINKS_READY_JS = "return document.querySelector(\"a[href*='/products/']\") !== null;"
+
+_LOAD_COMPLETE_JS = "return document.readyState === 'complete';"
+
+_lock = threading.Lock()
+_stats: dict = {}
+_loaded = False
+
+
+def _host(url: str) -> str:
+    return (urlparse(url).hostname or "").replace("www.", "")
+
+
+def _load() -> None:
+    global _loaded
+    if _loaded:
+        return
+    try:
+        with open(READY_STATS_FILE, "r", encoding="utf-8") as f:
+            _stats.update(json.load(f))
+    except (FileNotFoundError, ValueError):
+        pass
+    _loaded = True
+
+
+def _key(url: str, condition_js: str) -> str:
+    """Stats key: the host for product pages, a separate entry for any other wait."""
+    host = _host(url)
+    return host if condition_js == PRODUCT_READY_JS else f"{host} (listing)"
+
+
+def host_timeout(url: str, condition_js: str = PRODUCT_READY_JS) -> float:
+    """Timeout for this URL's host, from the p95 of its recorded ready times."""
+    with _lock:
+        _load()
+        samples = sorted(_stats.get(_key(url, condition_js), []))
+    if len(samples) < 5:
+        return DEFAULT_TIMEOUT
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return max(MIN_TIMEOUT, min(MAX_TIMEOUT, p95 * HEADROOM))
+
+
+def record(url: str, seconds: float, condition_js: str = PRODUCT_READY_JS) -> None:
+    """Add one ready-time sample for the URL's host."""
+    with _lock:
+        _load()
+        samples = _stats.setdefault(_key(url, condition_js), [])
+        samples.append(round(seconds, 2))
+        del samples[:-HISTORY_SIZE]
+
+
+def save_stats() -> None:
+    """Persist learned per-host ready times (call at the end of a batch)."""
+    with _lock:
+        if not _stats:
+            return
+        tmp = READY_STATS_FILE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(_stats, f)
+        os.replace(tmp, READY_STATS_FILE)
+
+
+def wait_until_ready(driver, url: str, condition_js: str = PRODUCT_READY_JS) -> float:
+    """
+    Block until `condition_js` returns true, the page finishes loading without
+    ever showing the signal (plus a short grace period), or the host timeout
+    expires. Returns seconds waited. Call right after driver.get(url).
+    """
+    timeout = host_timeout(url, condition_js)
+    start = time.monotonic()
+    complete_at = [None]
+    signalled = [False]
+
+    def ready(d) -> bool:
+        try:
+            if d.execute_script(condition_js):
+                signalled[0] = True
+                return True
+            # Pages that never carry the signal (404s, odd templates) shouldn't burn
+            # the whole timeout — stop shortly after the document finishes loading.
+            if d.execute_script(_LOAD_COMPLETE_JS):
+                if complete_at[0] is None:
+                    complete_at[0] = time.monotonic()
+                elif time.monotonic() - complete_at[0] > NO_SIGNAL_GRACE:
+                    return True
+        except (InvalidSessionIdException, NoSuchWindowException):
+            raise
+        except WebDriverException:
+            pass
+        return False
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL).until(ready)
+    except TimeoutException:
+        pass
+    waited = time.monotonic() - start
+    if signalled[0]:
+        record(url, waited, condition_js)
+    return waited
@@ -0,0 +1,236 @@
+"""
+page_snapshot.py — In-memory product page for the sneaker_bot extractors.
+
+One `driver.page_source` pull (or any raw HTML string) is parsed once into a
+light element tree; every extractor then runs against that tree instead of
+making its own WebDriver round-trips. Stdlib only, so extraction also works
+without a browser (archived pages, fixtures, benchmarks).
+
+Supported selectors are the simple compound forms the extractors use:
+    tag   .class   tag.class   [attr]   [attr='v']   [attr*='v']   tag[attr='v']
+"""
+
+import json
+import re
+from html.parser import HTMLParser
+from typing import Optional
+
+# Elements that never have children / a closing tag
+_VOID = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+}
+# Elements whose contents are never rendered as text
+_HIDDEN = {"script", "style", "noscript", "template", "head", "svg", "iframe"}
+# Elements that start a new line in rendered text (approximates innerText)
+_BLOCK = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3",
+    "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre",
+    "section", "table", "tr", "td", "th", "ul", "option", "button", "label",
+}
+
+
+class Node:
+    """One HTML element. Text children are kept as plain strings."""
+
+    __slots__ = ("tag", "attrs", "children", "classes")
+
+    def __init__(self, tag: str, attrs: dict):
+        self.tag = tag
+        self.attrs = attrs
+        self.children: list = []
+        self.classes = set((attrs.get("class") or "").split())
+
+    def get(self, name: str, default=None):
+        """Attribute value (mirrors WebElement.get_attribute for plain attributes)."""
+        return self.attrs.get(name, default)
+
+    def iter(self):
+        """Depth-first, document-order walk over this element and its descendants."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(c for c in reversed(node.children) if isinstance(c, Node))
+
+    @property
+    def raw_text(self) -> str:
+        """Concatenated text content, unrendered (use for <script> bodies)."""
+        out = []
+        for node in self.iter():
+            out.extend(c for c in node.children if isinstance(c, str))
+        return "".join(out)
+
+    @property
+    def text(self) -> str:
+        """Approximate rendered text — hidden elements skipped, blocks on their own line."""
+        parts: list[str] = []
+        _render(self, parts)
+        lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+
+def _render(node: Node, parts: list) -> None:
+    if node.tag in _HIDDEN:
+        return
+    block = node.tag in _BLOCK
+    if block:
+        parts.append("\n")
+    for child in node.children:
+        if isinstance(child, str):
+            parts.append(child.replace("\n", " "))
+        else:
+            _render(child, parts)
+    if block:
+        parts.append("\n")
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document", {})
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {k: (v if v is not None else "") for k, v in attrs})
+        self.stack[-1].children.append(node)
+        if tag not in _VOID:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.stack[-1].children.append(Node(tag, {k: (v if v is not None else "") for k, v in attrs}))
+
+    def handle_endtag(self, tag):
+        # Close up to the matching open tag; ignore stray end tags
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].tag == tag:
+                del self.stack[i:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1].children.append(data)
+
+
+# ── Selector matching ─────────────────────────────────────────────────────────
+_SELECTOR_RE = re.compile(
+    r"""^(?P<tag>[a-zA-Z][\w-]*)?"""
+    r"""(?P<classes>(?:\.[\w-]+)*)"""
+    r"""(?P<attr>\[(?P<name>[\w-]+)(?:(?P<op>\*?=)['"]?(?P<value>[^'"\]]*)['"]?)?\])?$"""
+)
+
+
+def _compile_selector(selector: str):
+    m = _SELECTOR_RE.match(selector.strip())
+    if not m:
+        raise ValueError(f"Unsupported selector: {selector!r}")
+    tag = (m.group("tag") or "").lower()
+    classes = [c for c in m.group("classes").split(".") if c]
+    name, op, value = m.group("name"), m.group("op"), m.group("value")
+
+    def matches(node: Node) -> bool:
+        if tag and node.tag != tag:
+            return False
+        if classes and not all(c in node.classes for c in classes):
+            return False
+        if name is not None:
+            if name not in node.attrs:
+                return False
+            if op == "=" and node.attrs[name] != value:
+                return False
+            if op == "*=" and value not in node.attrs[name]:
+                return False
+        return True
+
+    return matches
+
+
+_selector_cache: dict = {}
+
+
+def _matcher(selector: str):
+    fn = _selector_cache.get(selector)
+    if fn is None:
+        fn = _selector_cache[selector] = _compile_selector(selector)
+    return fn
+
+
+# ── Snapshot ──────────────────────────────────────────────────────────────────
+class PageSnapshot:
+    """A parsed product page. Build with from_html() or from_driver()."""
+
+    def __init__(self, html: str, url: str = ""):
+        self.html = html or ""
+        self.url = url
+        builder = _TreeBuilder()
+        builder.feed(self.html)
+        builder.close()
+        self.root = builder.root
+        self.memo: dict = {}        # per-page cache for extractor results (e.g. GTM data)
+        self._scripts: Optional[list] = None
+        self._ld_json: Optional[list] = None
+
+    @classmethod
+    def from_html(cls, html: str, url: str = "") -> "PageSnapshot":
+        return cls(html, url)
+
+    @classmethod
+    def from_driver(cls, driver) -> "PageSnapshot":
+        """Single WebDriver round-trip: pull the rendered DOM and parse it locally."""
+        return cls(driver.page_source, getattr(driver, "current_url", "") or "")
+
+    def select(self, selector: str) -> list:
+        match = _matcher(selector)
+        return [n for n in self.root.iter() if match(n)]
+
+    def select_one(self, selector: str) -> Optional[Node]:
+        match = _matcher(selector)
+        for n in self.root.iter():
+            if match(n):
+                return n
+        return None
+
+    @property
+    def title(self) -> str:
+        node = self.select_one("title")
+        return " ".join(node.raw_text.split()) if node is not None else ""
+
+    @property
+    def body_text(self) -> str:
+        node = self.select_one("body")
+        return (node or self.root).text
+
+    @property
+    def scripts(self) -> list:
+        """Text of every <script> element, in document order."""
+        if self._scripts is None:
+            self._scripts = [n.raw_text for n in self.select("script")]
+        return self._scripts
+
+    @property
+    def ld_json(self) -> list:
+        """Every JSON-LD block that parses, flattened (top-level lists are expanded)."""
+        if self._ld_json is None:
+            blocks = []
+            for node in self.select("script[type='application/ld+json']"):
+                try:
+                    data = json.loads(node.raw_text or "{}")
+                except Exception:
+                    continue
+                blocks.extend(data if isinstance(data, list) else [data])
+            self._ld_json = blocks
+        return self._ld_json
+
+    def meta(self, selector: str) -> str:
+        """content= of the first matching <meta>, stripped ('' if absent)."""
+        node = self.select_one(selector)
+        return (node.get("content") or "").strip() if node is not None else ""
+
+
+def as_snapshot(source) -> PageSnapshot:
+    """Accept a PageSnapshot, a raw HTML string, or a live WebDriver."""
+    if isinstance(source, PageSnapshot):
+        return source
+    if isinstance(source, str):
+        return PageSnapshot.from_html(source)
+    return PageSnapshot.from_driver(source)
@@ -0,0 +1,138 @@
+"""
+parse_stage.py — Process-pool stage for CPU-heavy page extraction.
+
+Browser workers only navigate and capture page HTML. Parsing (HTML tree,
+JSON-LD/GTM regexes, body-text price scan, slug decompounding,
+canonicalization) runs in a ProcessPoolExecutor, so the browsers can move on
+to the next URL at once and extraction uses every core instead of one GIL.
+
+    stage = ParseStage(parse_fn, workers=3)
+    stage.submit(on_done, url, html)   # on_done(url, item, error) when parsed
+    stage.close()                      # waits for everything submitted
+
+`parse_fn(url, html)` must be a module-level function, so it can be pickled
+for the worker processes.
+
+The workers are started from a clean interpreter (forkserver, or spawn where
+that's unavailable), never forked from the multi-threaded scraper, so they
+can't inherit a lock some thread was holding. They ignore Ctrl-C, which the
+scraper handles itself. If the pool dies anyway, pages are parsed inline in
+the scraper process instead of being lost. on_done and any inline parse run
+on the stage's own consumer thread, in the order pages finish.
+"""
+
+import multiprocessing
+import queue
+import signal
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+MAX_IN_FLIGHT_PER_WORKER = 4   # captured pages waiting per parse process before browsers block
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+_STOP = object()
+
+
+def _init_worker() -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _ping() -> bool:
+    return True
+
+
+class ParseStage:
+    def __init__(self, parse_fn, workers: int):
+        self.parse_fn = parse_fn
+        self.workers = workers
+        self._broken = False
+        self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                         mp_context=multiprocessing.get_context(START_METHOD))
+        # Start the workers now, so they're up before the browsers capture anything
+        try:
+            for f in [self._pool.submit(_ping) for _ in range(workers)]:
+                f.result()
+        except BrokenProcessPool as e:
+            self._pool_broke(e)
+        # Bounds the HTML held in memory when browsers outrun the parsers
+        self._slots = threading.BoundedSemaphore(workers * MAX_IN_FLIGHT_PER_WORKER)
+        # Parsed pages are handed to on_done on one consumer thread, never on the pool's
+        # result thread — a blocking on_done (writer backpressure) or an inline re-parse
+        # there would hold up the results of every worker
+        self._results: queue.Queue = queue.Queue()
+        self._consumer = threading.Thread(target=self._consume, name="parse-results", daemon=True)
+        self._consumer.start()
+
+    def submit(self, on_done, url: str, html: str) -> Future:
+        """Queue one captured page. Blocks while too many pages are waiting.
+        on_done(url, item, error) runs on the stage's consumer thread once it's parsed;
+        the returned Future resolves to the item after on_done has run."""
+        result = Future()
+        self._slots.acquire()
+        if self._broken:
+            self._results.put((on_done, url, html, None, result))
+            return result
+        try:
+            future = self._pool.submit(self.parse_fn, url, html)
+        except BrokenProcessPool as e:
+            self._pool_broke(e)
+            future = None
+        except Exception:
+            self._slots.release()
+            raise
+        if future is None:
+            self._results.put((on_done, url, html, None, result))
+        else:
+            future.add_done_callback(lambda f: self._results.put((on_done, url, html, f, result)))
+        return result
+
+    def _consume(self) -> None:
+        while True:
+            job = self._results.get()
+            if job is _STOP:
+                return
+            on_done, url, html, future, result = job
+            try:
+                err = future.exception() if future is not None else None
+                if future is None or isinstance(err, BrokenProcessPool):
+                    if err is not None:
+                        self._pool_broke(err)
+                    item, err = self._parse_inline(url, html)
+                else:
+                    item = None if err else future.result()
+                try:
+                    on_done(url, item, err)
+                except Exception as e:
+                    print(f"   ⚠️  Parse stage: handling {url} failed: {e}")
+                if err is None:
+                    result.set_result(item)
+                else:
+                    result.set_exception(err)
+            finally:
+                self._slots.release()
+
+    def _parse_inline(self, url: str, html: str):
+        try:
+            return self.parse_fn(url, html), None
+        except Exception as e:
+            return None, e
+
+    def _pool_broke(self, err) -> None:
+        if not self._broken:
+            self._broken = True
+            print(f"   ⚠️  Parse workers died ({err}) — parsing in the scraper process")
+
+    def close(self) -> None:
+        """Wait for every submitted page to be parsed and its on_done to run."""
+        self._pool.shutdown(wait=True)
+        self._results.put(_STOP)
+        self._consumer.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
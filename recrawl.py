@@ -0,0 +1,103 @@
+"""
+recrawl.py — Incremental recrawl driven by sitemap <lastmod>.
+
+The extractors write a sidecar next to every link file with each product's
+sitemap lastmod:
+
+    cdc_links.txt            one URL per line (unchanged format)
+    cdc_links.lastmod.json   {"https://.../products/x": "2026-10-02T10:00:00+05:30", ...}
+
+sneaker_bot records when each URL was last scraped successfully in
+SCRAPE_HISTORY_FILE. Pasting `cdc_links.txt:changed` then scrapes only the
+URLs whose lastmod is newer than that (plus URLs never scraped, or with no
+lastmod to compare against).
+"""
+
+import datetime
+import json
+import os
+import threading
+
+SCRAPE_HISTORY_FILE = ".scrape_history.json"
+
+_lock = threading.Lock()
+
+
+def lastmod_path(links_file: str) -> str:
+    """'cdc_links.txt' → 'cdc_links.lastmod.json'."""
+    base, _ = os.path.splitext(links_file)
+    return base + ".lastmod.json"
+
+
+def _write_json(path: str, data: dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=0, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _read_json(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def write_lastmods(links_file: str, entries) -> None:
+    """Save {url: lastmod} for a link file. `entries` is an iterable of (url, lastmod)."""
+    _write_json(lastmod_path(links_file), {u: lm for u, lm in entries if lm})
+
+
+def load_lastmods(links_file: str) -> dict:
+    return _read_json(lastmod_path(links_file))
+
+
+def parse_lastmod(value: str):
+    """W3C datetime ('2026-10-02', '2026-10-02T10:00:00Z', '...+05:30') → aware UTC datetime.
+    Returns None if the value is empty or unparseable."""
+    if not value:
+        return None
+    try:
+        dt = datetime.datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return dt.astimezone(datetime.timezone.utc)
+
+
+def load_history() -> dict:
+    """{url: ISO-8601 UTC time of the last successful scrape}."""
+    with _lock:
+        return _read_json(SCRAPE_HISTORY_FILE)
+
+
+def mark_scraped(urls, when: datetime.datetime = None, times: dict = None) -> None:
+    """Record a successful scrape of `urls` at `when` (default: now).
+    Pass the batch start time so edits made mid-run are picked up next time.
+    `times` ({url: datetime}) overrides `when` for URLs scraped at another time,
+    e.g. items a --resume run recovered from the journal of an earlier run."""
+    urls = list(urls)
+    if not urls:
+        return
+    stamp = (when or datetime.datetime.now(datetime.timezone.utc)).isoformat(timespec="seconds")
+    times = times or {}
+    with _lock:
+        history = _read_json(SCRAPE_HISTORY_FILE)
+        for u in urls:
+            history[u] = times[u].isoformat(timespec="seconds") if u in times else stamp
+        _write_json(SCRAPE_HISTORY_FILE, history)
+
+
+def select_changed(urls: list, lastmods: dict, history: dict) -> list:
+    """Keep URLs modified since their last successful scrape, in input order.
+    URLs never scraped, or without a usable lastmod, are always kept."""
+    out = []
+    for u in urls:
+        modified = parse_lastmod(lastmods.get(u, ""))
+        scraped = parse_lastmod(history.get(u, ""))
+        if modified is None or scraped is None or modified > scraped:
+            out.append(u)
+    return out
@@ -0,0 +1,162 @@
+"""
+resolver.py — Table-driven brand and retailer resolution.
+
+Everything is data: add a retailer or a D2C brand by adding a row below, no
+code changes needed.
+
+    resolve_retailer("https://www.superkicks.in/products/x")   → "Superkicks"
+    resolve_brand("Air Jordan 1 x Nike", url)                   → "Jordan"
+    resolve_brands([(name, url), ...])                          → one brand per pair
+
+Hosts resolve through a dict lookup on the hostname and each parent domain
+(www.superkicks.in → superkicks.in → in). Brand keywords are checked in
+BRAND_RULES order and the first hit wins, so Yeezy/Jordan still beat Nike
+exactly as before; results are memoised per name.
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+# ── Host tables ───────────────────────────────────────────────────────────────
+RETAILERS = {
+    'crepdogcrew.com':              'Crepdog Crew',
+    'marketplace.mainstreet.co.in': 'Mainstreet',
+    'superkicks.in':                'Superkicks',
+    'vegnonveg.com':                'VegNonVeg',
+    'limitededt.in':                'LTD Edition',
+}
+
+# D2C brands whose product names don't contain the brand name
+# (e.g. Comet sells "X Lows FLAMINGO", Thaely sells "Sneaker 01") — highest priority
+BRAND_HOSTS = {
+    'wearcomet.com':  'Comet',
+    'thaely.com':     'Thaely',
+    'gullylabs.com':  'Gully Labs',
+    'gullylabs.in':   'Gully Labs',
+    '7-10.in':        '7-10',
+    'baccabucci.com': 'Bacca Bucci',
+}
+
+UNKNOWN_RETAILER = 'Unknown'
+DEFAULT_BRAND    = 'Streetwear'
+
+# ── Brand keywords, in precedence order ───────────────────────────────────────
+# (regex, brand) — plain keywords are substring matches on the lowercased name.
+BRAND_RULES = [
+    # Collabs / sub-brands (before parent brands)
+    ('yeezy',         'Yeezy'),
+    ('jordan',        'Jordan'),
+    ('on x loewe',    'On Running'),
+    ('naked wolfe',   'Naked Wolfe'),
+    ('louis vuitton', 'Louis Vuitton'),
+    # Global brands
+    ('nike',          'Nike'),
+    ('adidas',        'Adidas'),
+    ('new balance',   'New Balance'),
+    ('converse',      'Converse'),
+    ('reebok',        'Reebok'),
+    ('under armour',  'Under Armour'),
+    ('asics',         'Asics'),
+    ('anta',          'Anta'),
+    ('brooks',        'Brooks Running'),
+    ('dior',          'Dior'),
+    ('fila',          'Fila'),
+    ('hoka',          'Hoka'),
+    ('li-ning',       'Li-Ning'),
+    ('onitsuka',      'Onitsuka Tiger'),
+    ('puma',          'Puma'),
+    ('salomon',       'Salomon'),
+    ('ugg',           'UGG'),
+    ('vans',          'Vans'),
+    ('crocs',         'Crocs'),
+    ('on running',    'On Running'),
+    # "cloud" alone is too generic — only match if paired with "on" context
+    # (avoid false match on "Air Max Cloud" etc.)
+    (r'\bon cloud\b|\bcloudmonster\b|\bcloudnova\b|\bcloudflow\b', 'On Running'),
+    # Indian D2C brands (text-based, when URL unavailable)
+    ('comet',         'Comet'),
+    ('thaely',        'Thaely'),
+    ('gully',         'Gully Labs'),
+    ('bacca bucci',   'Bacca Bucci'),
+]
+
+
+def _compile_rule(pattern: str):
+    """Plain keyword → itself (matched with `in`); anything with a backslash → compiled regex."""
+    return re.compile(pattern).search if '\\' in pattern else pattern
+
+
+# Compiled once; scanned in order and the first hit wins. An ordered scan of
+# C-level substring checks benchmarks faster under CPython's re than one big
+# keyword alternation, which has to try every branch at every position.
+_BRAND_MATCHERS = tuple((_compile_rule(p), brand) for p, brand in BRAND_RULES)
+
+
+# ── Lookups ───────────────────────────────────────────────────────────────────
+def _host(url: str) -> str:
+    try:
+        return (urlparse(url).hostname or '').lower()
+    except ValueError:
+        return ''
+
+
+_TABLES = (RETAILERS, BRAND_HOSTS)
+_RETAILER_TABLE, _BRAND_HOST_TABLE = 0, 1
+
+
+@lru_cache(maxsize=4096)
+def _lookup_host(table_id: int, host: str) -> Optional[str]:
+    table = _TABLES[table_id]
+    while host:
+        hit = table.get(host)
+        if hit is not None:
+            return hit
+        host = host.partition('.')[2]
+    return None
+
+
+def resolve_retailer(url: str) -> str:
+    """Map a product URL to its canonical retailer display name."""
+    return _lookup_host(_RETAILER_TABLE, _host(url)) or UNKNOWN_RETAILER
+
+
+def resolve_retailers(urls: Iterable[str]) -> list:
+    """resolve_retailer() for a whole list of URLs."""
+    return [resolve_retailer(u) for u in urls]
+
+
+@lru_cache(maxsize=65536)
+def brand_from_text(text: str) -> Optional[str]:
+    """Highest-precedence brand keyword found in `text`, or None."""
+    text = text.lower()
+    for rule, brand in _BRAND_MATCHERS:
+        if (rule in text) if rule.__class__ is str else rule(text):
+            return brand
+    return None
+
+
+def resolve_brand(text: str, url: str = "") -> str:
+    """
+    Detect brand from shoe name text + optional product URL.
+    URL-based detection handles D2C brands whose product names don't contain the brand name.
+    """
+    if url:
+        hit = _lookup_host(_BRAND_HOST_TABLE, _host(url))
+        if hit:
+            return hit
+    return brand_from_text(text) or DEFAULT_BRAND
+
+
+def resolve_brands(pairs: Iterable) -> list:
+    """resolve_brand() over (text, url) pairs — e.g. a full dump in one pass."""
+    cache: dict = {}
+    out = []
+    for text, url in pairs:
+        key = (text, _host(url) if url else '')
+        brand = cache.get(key)
+        if brand is None:
+            brand = cache[key] = resolve_brand(text, url)
+        out.append(brand)
+    return out
@@ -0,0 +1,99 @@
+"""
+result_writer.py — Background micro-batch writer for scraped items.
+
+Scraper threads put() items as soon as they are found; a single writer thread
+groups them and flushes to every sink (the SQLite catalog, MongoDB) whenever
+BATCH_SIZE items are pending or FLUSH_INTERVAL seconds have passed, so the
+catalog fills in while the scrape is still running.
+
+The hand-off queue is bounded: if a sink falls behind (e.g. Atlas is slow),
+put() blocks and the scrapers wait instead of piling results up in memory.
+"""
+
+import queue
+import threading
+import time
+
+BATCH_SIZE     = 25    # flush after this many items...
+FLUSH_INTERVAL = 15.0  # ...or this many seconds, whichever comes first
+MAX_PENDING    = 200   # queue bound — put() blocks beyond this (backpressure)
+
+_STOP = object()
+
+
+class ResultWriter:
+    """
+    Usage:
+        with ResultWriter([write_file, write_mongo]) as writer:
+            writer.put(item)
+    Each sink is a callable taking a list of items. A failing sink is reported
+    and skipped for that batch; it never stops the other sinks or the scrape.
+    `written` counts items at least one sink accepted; `failed_batches` /
+    `failed_items` count batches every sink rejected (reported again on close()).
+    """
+
+    def __init__(self, sinks, batch_size: int = BATCH_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL, max_pending: int = MAX_PENDING):
+        self.sinks = [s for s in sinks if s is not None]
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.failed_batches = 0
+        self.failed_items = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, item) -> None:
+        """Queue one item for writing. Blocks while the writer is MAX_PENDING behind."""
+        self._queue.put(item)
+
+    def close(self) -> None:
+        """Flush everything still pending and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+            if self.failed_batches:
+                print(f"   ⚠️  Writer: {self.failed_batches} batches ({self.failed_items} items) "
+                      f"could not be written to any sink")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _run(self) -> None:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                self._flush(batch)
+                return
+            if item is not None:
+                batch.append(item)
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _flush(self, batch: list) -> None:
+        if not batch:
+            return
+        saved = False
+        for sink in self.sinks:
+            try:
+                sink(batch)
+                saved = True
+            except Exception as e:
+                print(f"   ⚠️  Writer: {getattr(sink, '__name__', sink)} failed for {len(batch)} items: {e}")
+        if saved:
+            self.written += len(batch)
+        else:
+            self.failed_batches += 1
+            self.failed_items += len(batch)
@@ -0,0 +1,110 @@
+"""
+run_journal.py — On-disk checkpoint journal for sneaker_bot batch runs.
+
+Every URL's outcome is appended to .runs/<run-key>.jsonl the moment it is
+known, one JSON object per line:
+
+    {"url": "...", "state": "done",    "item": {...}, "at": "2026-10-17T09:00:00"}
+    {"url": "...", "state": "skipped", "item": null,  "at": "..."}
+    {"url": "...", "state": "failed",  "error": "...", "at": "..."}
+
+If Chrome crashes or the run is interrupted, `sneaker_bot.py --resume` reopens
+the same journal, skips every URL already done or skipped, retries the failed
+ones, and hands the journaled items back so they still get saved.
+"""
+
+import datetime
+import json
+import os
+import re
+import threading
+
+JOURNAL_DIR = ".runs"
+
+DONE    = "done"
+SKIPPED = "skipped"
+FAILED  = "failed"
+
+
+def run_key(spec: str) -> str:
+    """Filesystem-safe journal name for a batch spec like 'vnv_links.txt:pg 3:20'."""
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", spec.strip()).strip("_") or "batch"
+
+
+class RunJournal:
+    """Append-only, line-buffered record of per-URL outcomes for one batch."""
+
+    def __init__(self, key: str, resume: bool = False, directory: str = JOURNAL_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{run_key(key)}.jsonl")
+        self._lock = threading.Lock()
+        self._latest: dict = {}   # url → last record seen
+        self._resumed: dict = {}  # url → record replayed from an earlier run
+
+        if resume:
+            self._replay()
+            self._resumed = dict(self._latest)
+        self._fh = open(self.path, "a" if resume else "w", encoding="utf-8")
+
+    def _replay(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line from a hard crash
+                    if isinstance(rec, dict) and rec.get("url"):
+                        self._latest[rec["url"]] = rec
+        except FileNotFoundError:
+            pass
+
+    def is_finished(self, url: str) -> bool:
+        """True if the URL was already scraped or skipped (failed URLs are retried)."""
+        rec = self._latest.get(url)
+        return rec is not None and rec.get("state") in (DONE, SKIPPED)
+
+    def done_items(self) -> list:
+        """Items recorded as done, in the order they were first journaled."""
+        return [r["item"] for r in self._latest.values() if r.get("state") == DONE and r.get("item")]
+
+    def resumed_times(self) -> dict:
+        """{url: aware UTC datetime} for URLs an earlier run of this batch scraped."""
+        out = {}
+        for url, r in self._resumed.items():
+            if r.get("state") != DONE:
+                continue
+            try:
+                at = datetime.datetime.fromisoformat(r.get("at") or "")
+            except ValueError:
+                continue
+            out[url] = at.replace(tzinfo=datetime.timezone.utc)
+        return out
+
+    def counts(self) -> dict:
+        """{state: number of URLs} by each URL's latest outcome."""
+        out = {DONE: 0, SKIPPED: 0, FAILED: 0}
+        for r in self._latest.values():
+            out[r.get("state")] = out.get(r.get("state"), 0) + 1
+        return out
+
+    def record(self, url: str, state: str, item=None, error: str = "") -> None:
+        rec = {
+            "url":   url,
+            "state": state,
+            "item":  item,
+            "at":    datetime.datetime.utcnow().isoformat(timespec="seconds"),
+        }
+        if error:
+            rec["error"] = error
+        line = json.dumps(rec, ensure_ascii=False, default=str)
+        with self._lock:
+            self._latest[url] = rec
+            self._fh.write(line + "\n")
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
@@ -0,0 +1,256 @@
+"""
+scrape_metrics.py — Per-URL timings and outcome counters for sneaker_bot.
+
+Each scraped URL collects timing spans while it is worked on (the Shopify .js
+request, browser navigation, the readiness wait, page capture, extraction)
+and is written out when its outcome is known:
+
+    <METRICS_DIR>/scrape_metrics.jsonl   one line per URL / MongoDB write, appended as they happen
+    {"event": "url", "url": ..., "host": ..., "outcome": "found", "price_stage": "ld_json",
+     "decoded_bytes": 231455, "fetch_s": 2.91, "total_s": 3.37, "spans": {"navigate": 1.2, ...}, "at": ...}
+
+    <METRICS_DIR>/sneaker_bot.prom       Prometheus text format, rewritten every
+                                         PROM_INTERVAL seconds and at the end of a batch
+
+The .prom file holds counters by host and outcome, price stages, decoded bytes, span
+totals, MongoDB writes, and per-host fetch-latency quantiles over the last
+LATENCY_WINDOW pages. Point SNEAKER_METRICS_DIR at node_exporter's textfile
+collector directory to scrape it.
+
+    with scrape_metrics.span(url, "navigate"):
+        driver.get(url)
+    scrape_metrics.finish(url, scrape_metrics.FOUND, price_stage="ld_json")
+"""
+
+import contextlib
+import datetime
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from urllib.parse import urlparse
+
+METRICS_DIR    = os.environ.get("SNEAKER_METRICS_DIR", ".metrics")
+JSONL_FILE     = "scrape_metrics.jsonl"
+PROM_FILE      = "sneaker_bot.prom"
+PROM_INTERVAL  = 5.0   # seconds between .prom rewrites
+LATENCY_WINDOW = 500   # fetch latencies kept per host for the quantiles
+QUANTILES      = (0.5, 0.9, 0.99)
+
+FOUND   = "found"
+SKIPPED = "skipped"
+ERROR   = "error"
+
+# Spans that are spent waiting on the store (vs. our own CPU) — summed into fetch_s
+FETCH_SPANS = ("shopify_json", "navigate", "wait")
+
+_lock = threading.Lock()
+_open: dict = {}                               # url → in-progress record
+_urls = defaultdict(int)                       # (host, outcome) → count
+_price_stages = defaultdict(int)               # (host, stage) → count
+_decoded_bytes = defaultdict(int)              # host → decoded bytes
+_span_sum = defaultdict(float)                 # span → seconds
+_span_count = defaultdict(int)                 # span → count
+_latency = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))   # host → fetch seconds
+_latency_sum = defaultdict(float)
+_latency_count = defaultdict(int)
+_mongo = {"writes": 0, "errors": 0, "items": 0, "upserted": 0, "modified": 0, "unchanged": 0,
+          "seconds": 0.0}
+_jsonl = None
+_last_prom = 0.0
+
+
+def _host(url: str) -> str:
+    return (urlparse(url).hostname or "").replace("www.", "")
+
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+
+
+def _record(url: str) -> dict:
+    rec = _open.get(url)
+    if rec is None:
+        rec = _open[url] = {"start": time.monotonic(), "spans": {}, "bytes": 0}
+    return rec
+
+
+@contextlib.contextmanager
+def span(url: str, name: str):
+    """Time a block of work on `url` under `name`. Repeated spans add up."""
+    with _lock:
+        _record(url)   # total_s counts from the first span
+    t0 = time.monotonic()
+    try:
+        yield
+    finally:
+        add_span(url, name, time.monotonic() - t0)
+
+
+def add_span(url: str, name: str, seconds: float) -> None:
+    """Record a span measured elsewhere (e.g. extraction in a parse worker process)."""
+    with _lock:
+        spans = _record(url)["spans"]
+        spans[name] = spans.get(name, 0.0) + seconds
+
+
+def add_decoded_bytes(url: str, n: int) -> None:
+    """Count `n` bytes of decoded body (page HTML, .js JSON) read for `url`.
+    This is the size after Content-Encoding is undone, not the transfer size."""
+    with _lock:
+        _record(url)["bytes"] += n
+
+
+def finish(url: str, outcome: str, price_stage: str = "", error: str = "") -> None:
+    """Close out `url`: append its JSON line and update the counters."""
+    with _lock:
+        rec = _open.pop(url, None) or {"start": time.monotonic(), "spans": {}, "bytes": 0}
+        host = _host(url)
+        spans = {k: round(v, 3) for k, v in rec["spans"].items()}
+        fetch_s = sum(rec["spans"].get(s, 0.0) for s in FETCH_SPANS)
+        line = {
+            "event":         "url",
+            "url":           url,
+            "host":          host,
+            "outcome":       outcome,
+            "price_stage":   price_stage,
+            "decoded_bytes": rec["bytes"],
+            "fetch_s":       round(fetch_s, 3),
+            "total_s":       round(time.monotonic() - rec["start"], 3),
+            "spans":         spans,
+            "at":            _now(),
+        }
+        if error:
+            line["error"] = error[:300]
+
+        _urls[(host, outcome)] += 1
+        if price_stage:
+            _price_stages[(host, price_stage)] += 1
+        _decoded_bytes[host] += rec["bytes"]
+        for name, seconds in rec["spans"].items():
+            _span_sum[name] += seconds
+            _span_count[name] += 1
+        if fetch_s:
+            _latency[host].append(fetch_s)
+            _latency_sum[host] += fetch_s
+            _latency_count[host] += 1
+        _write_line(line)
+        _maybe_write_prom()
+
+
+def mongo_write(items: int, seconds: float, upserted: int = 0, modified: int = 0,
+                unchanged: int = 0, error: str = "") -> None:
+    """Record one save to MongoDB: `items` write operations sent, `unchanged` items
+    whose fingerprint matched the stored link."""
+    with _lock:
+        _mongo["writes"] += bool(items)
+        _mongo["errors"] += bool(error)
+        _mongo["items"] += items
+        _mongo["upserted"] += upserted
+        _mongo["modified"] += modified
+        _mongo["unchanged"] += unchanged
+        _mongo["seconds"] += seconds
+        line = {"event": "mongo_write", "items": items, "upserted": upserted,
+                "modified": modified, "unchanged": unchanged, "seconds": round(seconds, 3),
+                "at": _now()}
+        if error:
+            line["error"] = error[:300]
+        _write_line(line)
+        _maybe_write_prom()
+
+
+def flush() -> None:
+    """Rewrite the .prom file now (call at the end of a batch)."""
+    with _lock:
+        if _urls or _mongo["writes"]:
+            _write_prom()
+
+
+# ── Output ────────────────────────────────────────────────────────────────────
+def _write_line(line: dict) -> None:
+    global _jsonl
+    try:
+        if _jsonl is None:
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            _jsonl = open(os.path.join(METRICS_DIR, JSONL_FILE), "a", encoding="utf-8", buffering=1)
+        _jsonl.write(json.dumps(line) + "\n")
+    except OSError as e:
+        print(f"   ⚠️  Metrics not written: {e}")
+
+
+def _maybe_write_prom() -> None:
+    if time.monotonic() - _last_prom >= PROM_INTERVAL:
+        _write_prom()
+
+
+def _label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _quantile(values: list, q: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def _prom_text() -> str:
+    out = []
+
+    def metric(name, kind, help_text, samples):
+        out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            lbl = ",".join(f'{k}="{_label(v)}"' for k, v in labels)
+            out.append(f"{name}{{{lbl}}} {value}" if lbl else f"{name} {value}")
+
+    metric("sneaker_urls_total", "counter", "URLs scraped, by host and outcome.",
+           [((("host", h), ("outcome", o)), n) for (h, o), n in sorted(_urls.items())])
+    metric("sneaker_price_stage_total", "counter", "Extractor stage that resolved the price.",
+           [((("host", h), ("stage", s)), n) for (h, s), n in sorted(_price_stages.items())])
+    metric("sneaker_decoded_bytes_total", "counter",
+           "Page HTML and JSON bytes read, after decompression (not transfer size).",
+           [((("host", h),), n) for h, n in sorted(_decoded_bytes.items())])
+    metric("sneaker_span_seconds_total", "counter", "Time spent in each scrape step.",
+           [((("span", s),), round(v, 3)) for s, v in sorted(_span_sum.items())])
+    metric("sneaker_span_count_total", "counter", "Number of times each scrape step ran.",
+           [((("span", s),), n) for s, n in sorted(_span_count.items())])
+
+    latency = []
+    for host in sorted(_latency):
+        values = sorted(_latency[host])
+        for q in QUANTILES:
+            latency.append(((("host", host), ("quantile", q)), round(_quantile(values, q), 3)))
+    metric("sneaker_fetch_latency_seconds", "summary",
+           f"Time waiting on the store per URL (quantiles over the last {LATENCY_WINDOW} pages).",
+           latency)
+    for host in sorted(_latency_sum):
+        out.append(f'sneaker_fetch_latency_seconds_sum{{host="{_label(host)}"}} {round(_latency_sum[host], 3)}')
+        out.append(f'sneaker_fetch_latency_seconds_count{{host="{_label(host)}"}} {_latency_count[host]}')
+
+    metric("sneaker_mongo_writes_total", "counter", "MongoDB bulk writes.", [((), _mongo["writes"])])
+    metric("sneaker_mongo_write_errors_total", "counter", "MongoDB bulk writes that failed.",
+           [((), _mongo["errors"])])
+    metric("sneaker_mongo_items_total", "counter", "Write operations sent to MongoDB.", [((), _mongo["items"])])
+    metric("sneaker_mongo_upserted_total", "counter", "Catalog documents created.",
+           [((), _mongo["upserted"])])
+    metric("sneaker_mongo_modified_total", "counter", "Catalog documents updated.",
+           [((), _mongo["modified"])])
+    metric("sneaker_mongo_unchanged_total", "counter",
+           "Items whose URL, price, name and thumbnail matched the stored link.",
+           [((), _mongo["unchanged"])])
+    metric("sneaker_mongo_write_seconds_total", "counter", "Time spent in MongoDB bulk writes.",
+           [((), round(_mongo["seconds"], 3))])
+    return "\n".join(out) + "\n"
+
+
+def _write_prom() -> None:
+    global _last_prom
+    _last_prom = time.monotonic()
+    path = os.path.join(METRICS_DIR, PROM_FILE)
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        # node_exporter may read at any moment — never let it see a half-written file
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(_prom_text())
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"   ⚠️  Metrics not written: {e}")
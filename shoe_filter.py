@@ -0,0 +1,258 @@
+"""
+shoe_filter.py — Shared non-shoe URL classifier for every link extractor.
+
+One set of rules (previously copied, and drifting, across shopify_extractor.py,
+vnv_extractor.py and footlocker_extractor.py), compiled once into a single
+regex. Each rule list becomes a prefix-trie alternation, so a slug is scanned
+in one pass instead of ~100 separate substring checks.
+
+    classify("nk-club-fleece-hoodie")    → "prefix:nk-club-"
+    classify("air-jordan-1-high-og")     → None   (footwear)
+    classify_many(slugs)                 → one result per slug
+    split_footwear(urls)                 → (footwear_urls, filtered_count)
+
+"top"/"tops" are deliberately NOT token rules: they would drop high-top /
+low-top sneakers (Chuck 70 High Top, Dior B27 Low Top).
+"""
+
+import re
+from typing import Iterable, Optional
+
+_NON_SHOE_EXACT = {
+    # tops (incl. compound spellings)
+    "tee", "tees", "shirt", "shirts", "tshirt", "tshirts",
+    "hoodie", "hoody", "hoodies", "sweatshirt", "crewneck", "polo", "cardigan",
+    "sweater", "jumper", "fleece", "vest", "bralet", "bralette", "pullover", "jersey",
+    "longsleeve",
+    "bra",                             # sports bras (Mainstreet Nike x Skims, Superkicks)
+    # bottoms
+    "pant", "pants", "legging", "leggings", "jogger", "joggers",
+    "sweatpant", "sweatpants", "sweatshort", "sweatshorts",
+    "short", "shorts", "jeans", "trouser", "trousers",
+    "trackpant", "trackpants", "chino", "chinos",
+    "cargos",                          # cargo pants plural (CDC: oddnoteven-*-cargos)
+    # sets / outerwear
+    "tracksuit", "tracksuits",
+    "jacket", "jackets", "windbreaker", "anorak", "coat", "parka", "raincoat",
+    "bomber",                          # bomber jackets (Superkicks, VNV)
+    # dresses / women
+    "dress", "skirt", "romper", "bodysuit", "swimsuit", "swimwear",
+    # headwear
+    "cap", "caps", "hat", "hats", "beanie", "beanies", "bonnet",
+    "headband", "bucket",
+    "5950",                            # New Era fitted cap model (LimitedEdt)
+    "strapback",                       # strapback caps
+    "trucker",                         # trucker caps and trucker jackets
+    # accessories
+    "bag", "bags", "backpack", "tote", "pouch", "wallet", "purse",
+    "keychain", "keyring", "lanyard", "belt", "belts",
+    "glasses", "sunglasses", "goggles",
+    "scarf", "scarves", "glove", "gloves",
+    # footwear accessories (not shoes themselves)
+    "sock", "socks", "insole", "insoles", "laces", "lace",
+    # care / cleaning
+    "spray", "cleaner", "eraser", "brush", "wipe", "towel",
+    "kit", "protector", "deodorizer",
+    # collectibles / lifestyle
+    "figure", "toy", "doll", "poster", "sticker",
+    "mug", "tumbler", "blanket",
+    "umbrella", "watch",
+    "candle", "diffuser",
+    # misc
+    "giftcard", "voucher",
+    # apparel not yet covered
+    "overshirt",                       # ls-overshirt, denim-overshirt, etc.
+    "jorts", "skorts",                 # VNV own-brand jean-shorts / skirt-shorts
+    "gilet",                           # VNV sleeveless jacket
+    "gharara",                         # VNV ethnic pant
+    "apron",                           # ASSC apron
+    # home / lifestyle
+    "rug", "rugs",                     # Virgil x IKEA rug, Pokemon TCG rug
+    "chair",                           # Urban Islander chair (LimitedEdt)
+    "cushion",                         # cushion cover (CDC)
+    "necklace",                        # tennis necklace (CDC)
+    "waistbag",                        # waist bag (VNV)
+    "keyholder",                       # key holder (VNV)
+    # food
+    "cookie", "cookies",               # Oreo collab items (Mainstreet)
+    # swimming
+    "swimshort", "swimshorts",
+}
+
+# Substrings that always indicate non-footwear
+_NON_SHOE_SUBSTR = (
+    # caps / headwear
+    "-cap-", "-cap", "bucket-hat", "trucker-cap", "dad-cap", "snapback",
+    "-beanie", "five-panel",
+    "cargo-type",                      # cargo pants pattern
+    # laces / insoles
+    "shoelace", "flat-lace", "-lace-", "-laces-", "-insole",
+    # bags
+    "-bag-", "-bag", "tote-bag", "duffel", "gym-bag", "carry-bag", "-backpack",
+    # socks
+    "-sock-", "-socks-", "-sock", "-socks", "ankle-sock", "crew-sock",
+    # care
+    "-spray", "cleaning-towel", "microfiber", "crep-protect", "shoe-care",
+    "laundry-bag",
+    # apparel substrings (compound words and phrases not caught by token split)
+    "tshirt", "t-shirt", "longsleeve", "long-sleeve",
+    "tracktop", "track-top", "track-jacket", "tracksuit", "windbreaker",
+    "basketball-short", "terry-short", "diamond-short", "denim-short",
+    "sweat-short", "running-short", "sweatshort",
+    "trouser", "jersey", "jerseyfan", "-jersey-", "football-jersey", "football-scarf",
+    "one-piece", "bodysuit",
+    # collectibles (bearbrick included intentionally — sold at sneaker stores)
+    "blind-box", "kaws",
+    # Nike/Adidas internal apparel item codes
+    "as-m-", "as-w-", "as-lbj-", "as-kd-",
+    "nk-heritage-", "nk-club-", "nk-nsw-",
+    # gift / misc
+    "gift-card", "e-gift", "voucher",
+    # accessories
+    "-keychain", "-keyring", "-wallet", "-watch",
+    "phone-case", "-tumbler", "-mug",
+    "-umbrella", "-poster", "-sticker",
+    # caps by model / brand name
+    "59fifty",                         # New Era 59Fifty cap model
+    "new-era-",                        # New Era brand prefix for caps
+    "5-panel-hat",                     # 5-panel hat
+    # collectibles
+    "funko-pop", "funko",              # Funko Pop figures
+    "pokemon-tcg",                     # Pokemon TCG cards/rugs
+    # home goods
+    "-rug",                            # rug items
+    "-apron",                          # aprons
+    "-cushion",                        # cushion covers
+    "-journal",                        # journals / books
+    # accessories
+    "waist-bag",                       # hyphenated waist bag variant
+    "-necklace",                       # necklaces
+    "-keyholder",                      # key holders
+    # food
+    "oreo",                            # Oreo collab food items
+    # apparel substrings
+    "overshirt",                       # overshirt as compound word in slug
+    "sleeveless",                      # sleeveless tee
+    "-swimshort",                      # swim shorts
+    # Puma collab apparel (VNV — compound words without hyphens)
+    "pumaxbatman", "pumaxgarfield", "pumaxamigraphic",
+    "rickandmorty", "harlemtee",
+    # branded bags / accessories
+    "longchamp",                       # Longchamp handbags
+    "sprayground",                     # Sprayground bags
+    "-handbag",                        # generic handbag suffix
+    # care products
+    "crep-cure",                       # Crep Cure shoe cleaner brand
+    "hat-care-kit",                    # hat care kit
+    # misc
+    "pantalon",                        # pants (French collab)
+    "-bottle",                         # water bottles
+)
+
+# Slug prefixes that are always non-shoe
+_APPAREL_PREFIXES = (
+    "as-m-", "as-w-", "as-lbj-", "as-kd-",
+    "nk-heritage-", "nk-club-", "nk-nsw-",
+    "ua-", "ub-",
+)
+
+# Slug suffixes that are always non-shoe
+_NON_SHOE_SUFFIXES = (
+    "-cap", "-hat", "-socks", "-sock", "-bag", "-backpack",
+    "-tee", "-hoodie", "-jacket", "-shorts", "-pant", "-pants",
+    "-jersey", "-polo", "-vest", "-laces", "-insole",
+    "-spray", "-kit", "-brush",
+    "-blazer",                         # jacket blazer (≠ Nike Blazer which has -mid/-low after)
+    "-tshirt",
+    "-trouser", "-trousers",
+    "-scarf", "-gloves", "-glove",
+    "-tracksuit", "-trackpant", "-trackpants",
+    "-longsleeve",
+    "-overshirt",                      # catches *-overshirt slugs
+    "-rug",
+    "-apron",
+    "-cushion",
+    "-necklace",
+)
+
+
+# ── Compiled matcher ──────────────────────────────────────────────────────────
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Regex alternation for `words`, factored by common prefix so the engine
+    walks a trie rather than trying every word at every position."""
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        ends = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends:
+            body = "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+# Precedence when several rules match is whatever the regex finds first —
+# the verdict (shoe / not shoe) is identical to checking every list in turn.
+_MATCHER = re.compile(
+    "(?P<prefix>^" + _trie_pattern(_APPAREL_PREFIXES) + ")"
+    "|(?P<suffix>" + _trie_pattern(_NON_SHOE_SUFFIXES) + "$)"
+    # whole slug token: bounded by start/end or a - / _ separator
+    "|(?P<token>(?<![^-_])" + _trie_pattern(_NON_SHOE_EXACT) + "(?![^-_]))"
+    "|(?P<substr>" + _trie_pattern(_NON_SHOE_SUBSTR) + ")"
+)
+
+
+def _normalise(slug: str) -> str:
+    return slug.lower().split("?")[0]
+
+
+def classify(slug: str) -> Optional[str]:
+    """Return the rule that marks this product slug as non-footwear, as
+    '<kind>:<text>' (kind is prefix, suffix, token or substr), or None for footwear."""
+    m = _MATCHER.search(_normalise(slug))
+    if m is None:
+        return None
+    return f"{m.lastgroup}:{m.group(m.lastgroup)}"
+
+
+def is_non_shoe(slug: str) -> bool:
+    """Return True if the product slug is NOT footwear."""
+    return _MATCHER.search(_normalise(slug)) is not None
+
+
+def classify_many(slugs: Iterable[str]) -> list:
+    """classify() for a whole list of slugs in one call."""
+    search = _MATCHER.search
+    out = []
+    for slug in slugs:
+        m = search(_normalise(slug))
+        out.append(None if m is None else f"{m.lastgroup}:{m.group(m.lastgroup)}")
+    return out
+
+
+def slug_of(url: str) -> str:
+    """'https://x.com/products/air-max-1?variant=1' → 'air-max-1?variant=1'."""
+    return url.split("/products/")[-1]
+
+
+def split_footwear(urls: Iterable[str]) -> tuple:
+    """Deduplicate `urls` (keeping first-seen order) and drop non-footwear.
+    Returns (footwear_urls, number_filtered_out)."""
+    seen: set = set()
+    unique = []
+    for u in urls:
+        if u not in seen:
+            seen.add(u)
+            unique.append(u)
+    search = _MATCHER.search
+    footwear = [u for u in unique if search(_normalise(slug_of(u))) is None]
+    return footwear, len(unique) - len(footwear)
@@ -12,14 +12,17 @@ Output files (one per store, ready to paste into sneaker_bot.py):
     mainstreet_links.txt
     superkicks_links.txt
     limitededt_links.txt
+Each also gets a <name>.lastmod.json sidecar with every URL's sitemap <lastmod>,
+used by sneaker_bot.py's 'file.txt:changed' incremental mode.
 """
 
+import asyncio
 import sys
-import time
-import urllib.request
-import urllib.error
-import xml.etree.ElementTree as ET
-from typing import Optional
+
+import recrawl
+import shoe_filter
+import sitemap_engine
+from sitemap_engine import HostLimiter
 
 # ── Store definitions ─────────────────────────────────────────────────────────
 STORES = {
@@ -45,286 +48,70 @@ STORES = {
     },
 }
 
-# ── Non-shoe filter ───────────────────────────────────────────────────────────
-_NON_SHOE_EXACT = {
-    # tops (incl. compound spellings)
-    "tee", "tees", "shirt", "shirts", "tshirt", "tshirts",
-    "hoodie", "hoodies", "sweatshirt", "crewneck", "polo", "cardigan",
-    "sweater", "jumper", "fleece", "vest", "bralet", "pullover", "jersey",
-    "longsleeve",
-    # bottoms
-    "pant", "pants", "legging", "leggings", "jogger", "joggers",
-    "sweatpant", "sweatpants", "sweatshort", "sweatshorts",
-    "short", "shorts", "jeans", "trouser", "trousers",
-    "trackpant", "trackpants", "chino", "chinos",
-    "cargos",                          # cargo pants plural (CDC: oddnoteven-*-cargos)
-    # sets / outerwear
-    "tracksuit", "tracksuits",
-    "jacket", "jackets", "windbreaker", "anorak", "coat", "parka", "raincoat",
-    # dresses / women
-    "dress", "skirt", "romper", "bodysuit", "swimsuit", "swimwear",
-    # headwear
-    "cap", "caps", "hat", "hats", "beanie", "beanies", "bonnet",
-    "headband", "bucket",
-    "5950",                            # New Era fitted cap model (LimitedEdt)
-    "strapback",                       # strapback caps
-    "trucker",                         # trucker caps and trucker jackets
-    # accessories
-    "bag", "bags", "backpack", "tote", "pouch", "wallet", "purse",
-    "keychain", "keyring", "lanyard", "belt", "belts",
-    "glasses", "sunglasses", "goggles",
-    "scarf", "scarves", "glove", "gloves",
-    # footwear accessories (not shoes themselves)
-    "sock", "socks", "insole", "insoles", "laces", "lace",
-    # care / cleaning
-    "spray", "cleaner", "eraser", "brush", "wipe", "towel",
-    "kit", "protector", "deodorizer",
-    # collectibles / lifestyle
-    "figure", "toy", "doll", "poster", "sticker",
-    "mug", "tumbler", "blanket",
-    "umbrella", "watch",
-    "candle", "diffuser",
-    # misc
-    "giftcard", "voucher",
-    # apparel not yet covered
-    "overshirt",                       # ls-overshirt, denim-overshirt, etc.
-    "jorts", "skorts",                 # VNV own-brand jean-shorts / skirt-shorts
-    "gilet",                           # VNV sleeveless jacket
-    "gharara",                         # VNV ethnic pant
-    "apron",                           # ASSC apron
-    # home / lifestyle
-    "rug", "rugs",                     # Virgil x IKEA rug, Pokemon TCG rug
-    "chair",                           # Urban Islander chair (LimitedEdt)
-    "cushion",                         # cushion cover (CDC)
-    "necklace",                        # tennis necklace (CDC)
-    "waistbag",                        # waist bag (VNV)
-    "keyholder",                       # key holder (VNV)
-    # food
-    "cookie", "cookies",               # Oreo collab items (Mainstreet)
-    # swimming
-    "swimshort", "swimshorts",
-}
-
-_NON_SHOE_SUBSTR = (
-    # caps / headwear
-    "-cap-", "-cap", "bucket-hat", "trucker-cap", "dad-cap", "snapback",
-    "-beanie", "five-panel",
-    "cargo-type",                      # CDC cargo pants pattern: cargo-type-1, cargo-type-2...
-    # laces / insoles
-    "shoelace", "flat-lace", "-lace-", "-laces-", "-insole",
-    # bags
-    "-bag-", "-bag", "tote-bag", "duffel", "gym-bag", "carry-bag", "-backpack",
-    # socks
-    "-sock-", "-socks-", "-sock", "-socks", "ankle-sock", "crew-sock",
-    # care
-    "-spray", "cleaning-towel", "microfiber", "crep-protect", "shoe-care",
-    "laundry-bag",
-    # apparel substrings (compound words and phrases not caught by token split)
-    "tshirt", "t-shirt", "longsleeve", "long-sleeve",
-    "tracktop", "track-top", "track-jacket", "tracksuit", "windbreaker",
-    "basketball-short", "terry-short", "diamond-short", "denim-short",
-    "sweat-short", "running-short", "sweatshort",
-    "trouser", "jersey", "jerseyfan", "-jersey-", "football-jersey", "football-scarf",
-    "one-piece", "bodysuit",
-    # collectibles (bearbrick included intentionally — sold at sneaker stores)
-    "blind-box", "kaws",
-    # Nike/Adidas internal apparel item codes
-    "as-m-", "as-w-", "as-lbj-", "as-kd-",
-    "nk-heritage-", "nk-club-", "nk-nsw-",
-    # gift / misc
-    "gift-card", "e-gift", "voucher",
-    # accessories
-    "-keychain", "-keyring", "-wallet", "-watch",
-    "phone-case", "-tumbler", "-mug",
-    "-umbrella", "-poster", "-sticker",
-    # caps by model / brand name
-    "59fifty",                         # New Era 59Fifty cap model (FOG caps, LimitedEdt)
-    "new-era-",                        # New Era brand prefix for caps
-    "5-panel-hat",                     # 5-panel hat (Superkicks)
-    # collectibles
-    "funko-pop", "funko",              # Funko Pop figures (CDC)
-    "pokemon-tcg",                     # Pokemon TCG cards/rugs (LimitedEdt)
-    # home goods
-    "-rug",                            # rug items
-    "-apron",                          # aprons
-    "-cushion",                        # cushion covers
-    "-journal",                        # journals / books (LimitedEdt)
-    # accessories
-    "waist-bag",                       # hyphenated waist bag variant
-    "-necklace",                       # necklaces
-    "-keyholder",                      # key holders
-    # food
-    "oreo",                            # Oreo collab food items (Mainstreet)
-    # apparel substrings
-    "overshirt",                       # overshirt as compound word in slug
-    "sleeveless",                      # sleevelesstee (LimitedEdt)
-    "-swimshort",                      # swim shorts
-    # Puma collab apparel (VNV — compound words without hyphens)
-    "pumaxbatman", "pumaxgarfield", "pumaxamigraphic",
-    "rickandmorty", "harlemtee",
-    # branded bags / accessories
-    "longchamp",                       # Longchamp handbags (CDC)
-    "sprayground",                     # Sprayground bags (CDC)
-    "-handbag",                        # generic handbag suffix
-    # care products
-    "crep-cure",                       # Crep Cure shoe cleaner brand
-    "hat-care-kit",                    # hat care kit (VNV)
-    # misc
-    "pantalon",                        # pants (French collab, VNV)
-    "-bottle",                         # water bottles (VNV)
-)
-
-_APPAREL_PREFIXES = (
-    "as-m-", "as-w-", "as-lbj-", "as-kd-",
-    "nk-heritage-", "nk-club-", "nk-nsw-",
-    "ua-", "ub-",
-)
-
-_NON_SHOE_SUFFIXES = (
-    "-cap", "-hat", "-socks", "-sock", "-bag", "-backpack",
-    "-tee", "-hoodie", "-jacket", "-shorts", "-pant", "-pants",
-    "-jersey", "-polo", "-vest", "-laces", "-insole",
-    "-spray", "-kit", "-brush",
-    "-blazer",          # jacket blazer (≠ Nike Blazer which has -mid/-low after)
-    "-tshirt",          # compound tshirt suffix
-    "-trouser", "-trousers",
-    "-scarf", "-gloves", "-glove",
-    "-tracksuit", "-trackpant", "-trackpants",
-    "-longsleeve",
-    "-overshirt",                      # catches *-overshirt slugs
-    "-rug",
-    "-apron",
-    "-cushion",
-    "-necklace",
-)
-
-
-def _is_non_shoe(slug: str) -> bool:
-    """Return True if the product slug is NOT footwear."""
-    s = slug.lower().split("?")[0]
-    if s.startswith(_APPAREL_PREFIXES):
-        return True
-    if s.endswith(_NON_SHOE_SUFFIXES):
-        return True
-    words = set(s.replace("_", "-").split("-"))
-    if words & _NON_SHOE_EXACT:
-        return True
-    return any(kw in s for kw in _NON_SHOE_SUBSTR)
-
-
-# ── HTTP helpers ──────────────────────────────────────────────────────────────
+# ── Sitemap parsing ───────────────────────────────────────────────────────────
 _HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; SitemapBot/1.0)"}
-NS = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
-
-
-def _fetch(url: str, retries: int = 3) -> bytes:
-    for attempt in range(1, retries + 1):
-        try:
-            req = urllib.request.Request(url, headers=_HEADERS)
-            with urllib.request.urlopen(req, timeout=15) as r:
-                return r.read()
-        except urllib.error.HTTPError as e:
-            print(f"     HTTP {e.code} on {url}")
-            if attempt < retries:
-                time.sleep(2)
-            else:
-                return b""
-        except Exception as e:
-            print(f"     Error fetching {url}: {e}")
-            if attempt < retries:
-                time.sleep(2)
-            else:
-                return b""
-    return b""
-
-
-def _parse_xml(data: bytes) -> Optional[ET.Element]:
-    try:
-        return ET.fromstring(data)
-    except ET.ParseError as e:
-        print(f"     XML parse error: {e}")
-        return None
 
+_IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".svg", ".avif")
 
-# ── Sitemap parsing ───────────────────────────────────────────────────────────
-def get_product_sitemaps(root_sitemap_url: str) -> list[str]:
-    """Parse a Shopify <sitemapindex> and return all sitemap_products_*.xml URLs."""
-    data = _fetch(root_sitemap_url)
-    if not data:
-        return []
-    root = _parse_xml(data)
-    if root is None:
-        return []
-
-    # Handle both namespaced and non-namespaced XML
-    locs = [e.text.strip() for e in root.iter() if e.tag.endswith("loc") and e.text]
-    return [loc for loc in locs if "sitemap_products_" in loc]
 
+def _is_product_sitemap(loc: str) -> bool:
+    return "sitemap_products_" in loc
 
-_IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".svg", ".avif")
 
-def extract_product_urls(product_sitemap_url: str) -> list[str]:
-    """Fetch a Shopify product sub-sitemap and return all /products/ page URLs.
+def _is_product_url(loc: str) -> bool:
+    """Keep /products/ page URLs only.
 
     Shopify sitemaps embed <image:loc> CDN image URLs inside <url> blocks.
     Those also contain '/products/' in the path, so we must filter them out
     by excluding cdn.shopify.com URLs and any URL ending with an image extension.
     """
-    data = _fetch(product_sitemap_url)
-    if not data:
-        return []
-    root = _parse_xml(data)
-    if root is None:
-        return []
-    locs = [e.text.strip() for e in root.iter() if e.tag.endswith("loc") and e.text]
-    return [
-        loc for loc in locs
-        if "/products/" in loc
+    return (
+        "/products/" in loc
         and "cdn.shopify.com" not in loc
         and not loc.lower().endswith(_IMAGE_EXTS)
-    ]
+    )
+
+
+def get_product_sitemaps(root_sitemap_url: str) -> list[str]:
+    """Parse a Shopify <sitemapindex> and return all sitemap_products_*.xml URLs."""
+    return asyncio.run(sitemap_engine.sub_sitemaps(
+        root_sitemap_url, _is_product_sitemap, HostLimiter(), _HEADERS))
+
+
+def extract_product_urls(product_sitemap_url: str) -> list[str]:
+    """Fetch a Shopify product sub-sitemap and return all /products/ page URLs."""
+    return [loc for loc, _ in sitemap_engine.iter_sitemap(product_sitemap_url, _HEADERS)
+            if _is_product_url(loc)]
 
 
 # ── Per-store extraction ──────────────────────────────────────────────────────
-def extract_store(store_key: str) -> int:
-    """Extract, filter and save footwear URLs for one store. Returns count."""
+async def extract_store_async(store_key: str, limiter: HostLimiter) -> int:
+    """Extract, filter and save footwear URLs for one store. Returns count.
+    All of the store's product sub-sitemaps are fetched concurrently."""
     cfg = STORES[store_key]
     name = cfg["name"]
     out  = cfg["output"]
 
-    print(f"\n{'=' * 58}")
-    print(f"  {name}")
-    print(f"{'=' * 58}")
-    print(f"  Fetching root sitemap: {cfg['sitemap']}")
-
-    product_sitemaps = get_product_sitemaps(cfg["sitemap"])
+    print(f"  [{name}] Fetching root sitemap: {cfg['sitemap']}")
+    product_sitemaps = await sitemap_engine.sub_sitemaps(
+        cfg["sitemap"], _is_product_sitemap, limiter, _HEADERS)
     if not product_sitemaps:
-        print("  ❌ No product sitemaps found.")
+        print(f"  [{name}] ❌ No product sitemaps found.")
         return 0
 
-    print(f"\n  Found {len(product_sitemaps)} product sitemap(s)")
-
-    all_urls: list[str] = []
-    for i, sm_url in enumerate(product_sitemaps, 1):
-        print(f"\n  [{i}/{len(product_sitemaps)}] {sm_url.split('/')[-1].split('?')[0]} ...", end=" ", flush=True)
-        urls = extract_product_urls(sm_url)
-        print(f"{len(urls)} products")
-        all_urls.extend(urls)
-        time.sleep(0.5)
-
-    # Deduplicate + filter
-    seen: set[str] = set()
-    footwear: list[str] = []
-    filtered_out = 0
-    for u in all_urls:
-        if u in seen:
-            continue
-        seen.add(u)
-        slug = u.split("/products/")[-1]
-        if _is_non_shoe(slug):
-            filtered_out += 1
-        else:
-            footwear.append(u)
+    print(f"  [{name}] Found {len(product_sitemaps)} product sitemap(s)")
+
+    def on_done(sm_url: str, entries: list) -> None:
+        print(f"  [{name}] {sm_url.split('/')[-1].split('?')[0]} → {len(entries)} products")
+
+    per_sitemap = await sitemap_engine.fetch_all(
+        product_sitemaps, limiter, _HEADERS, keep=_is_product_url, on_done=on_done)
+
+    # Deduplicate + filter (keeping each URL's <lastmod> for incremental recrawls)
+    lastmods: dict[str, str] = {}
+    for u, lastmod in (e for entries in per_sitemap for e in entries):
+        lastmods.setdefault(u, lastmod)
+    footwear, filtered_out = shoe_filter.split_footwear(lastmods)
 
     # Write output
     with open(out, "w", encoding="utf-8") as f:
@@ -333,12 +120,24 @@ def extract_store(store_key: str) -> int:
         f.write(f"# To scrape: run sneaker_bot.py and paste '{out}'\n\n")
         for url in footwear:
             f.write(url + "\n")
+    recrawl.write_lastmods(out, ((u, lastmods[u]) for u in footwear))
 
-    print(f"\n  ✅ {len(footwear)} footwear URLs  ({filtered_out} non-shoe filtered)")
-    print(f"  Saved to: {out}")
+    print(f"  [{name}] ✅ {len(footwear)} footwear URLs  ({filtered_out} non-shoe filtered) → {out}")
     return len(footwear)
 
 
+def extract_store(store_key: str) -> int:
+    """Synchronous wrapper around extract_store_async for a single store."""
+    return asyncio.run(extract_store_async(store_key, HostLimiter()))
+
+
+async def _extract_stores(keys: list[str]) -> dict[str, int]:
+    """Run every requested store concurrently under one shared per-host limiter."""
+    limiter = HostLimiter()
+    counts = await asyncio.gather(*(extract_store_async(k, limiter) for k in keys))
+    return dict(zip(keys, counts))
+
+
 # ── Main ──────────────────────────────────────────────────────────────────────
 def main():
     args = [a.lower() for a in sys.argv[1:]]
@@ -353,9 +152,8 @@ def main():
         keys = list(STORES.keys())
 
     print("\n  Shopify Sitemap Extractor")
-    totals = {}
-    for key in keys:
-        totals[key] = extract_store(key)
+    print(f"  {len(keys)} store(s), up to {sitemap_engine.PER_HOST_CONCURRENCY} requests per host\n")
+    totals = asyncio.run(_extract_stores(keys))
 
     print(f"\n{'=' * 58}")
     print("  Summary:")
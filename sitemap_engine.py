@@ -0,0 +1,223 @@
+"""
+sitemap_engine.py — Shared asyncio sitemap crawler for the link extractors.
+
+Fetches a root sitemap, then every product sub-sitemap concurrently. A per-host
+semaphore caps how many requests any one store sees at once, so running all
+stores together is still polite. Used by shopify_extractor.py and vnv_extractor.py.
+Fetches go through http_cache over http_client's pooled keep-alive connections,
+so sitemaps that haven't changed since the last run are neither re-downloaded
+(304) nor re-parsed (same body hash). Bodies are parsed incrementally
+(iter_entries), gzipped or not, so memory stays flat however large a sitemap is.
+
+Typical use:
+    limiter = HostLimiter()
+    subs = await sub_sitemaps(root_url, lambda loc: "products" in loc, limiter)
+    per_sitemap = await fetch_all(subs, limiter)
+"""
+
+import asyncio
+import time
+import urllib.error
+import zlib
+import xml.etree.ElementTree as ET
+from typing import Callable, Optional
+from urllib.parse import urlparse
+
+import http_cache
+import http_client
+
+PER_HOST_CONCURRENCY = 4   # max in-flight requests per store
+FETCH_TIMEOUT        = 15  # seconds per request
+FETCH_RETRIES        = 3
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; SitemapBot/1.0)"}
+
+
+# ── Streaming parse ───────────────────────────────────────────────────────────
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _local(tag: str) -> str:
+    """Strip the XML namespace: '{http://...}loc' → 'loc'."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def _inflate(inflate, data: bytes):
+    """Decompress `data` in bounded pieces — sitemaps compress 20-50x."""
+    while data:
+        yield inflate.decompress(data, http_client.CHUNK_SIZE)
+        data = inflate.unconsumed_tail
+
+
+def _read_entries(parser, state: dict):
+    """Entries completed by the last feed(); state carries root + depth between calls."""
+    for event, elem in parser.read_events():
+        if event == "start":
+            if state["root"] is None:
+                state["root"] = elem
+            state["depth"] += 1
+            continue
+        state["depth"] -= 1
+        if state["depth"] != 1:
+            continue
+        # a whole top-level entry under <urlset> / <sitemapindex>
+        if _local(elem.tag) in ("url", "sitemap"):
+            loc = lastmod = ""
+            for child in elem:
+                name = _local(child.tag)
+                if name == "loc" and child.text:
+                    loc = child.text.strip()
+                elif name == "lastmod" and child.text:
+                    lastmod = child.text.strip()
+            if loc:
+                yield loc, lastmod
+        elem.clear()
+        state["root"].clear()
+
+
+def iter_entries(chunks):
+    """Yield (loc, lastmod) for every <url> / <sitemap> entry while the document
+    is still arriving. `chunks` is any iterable of bytes; a gzipped sitemap
+    (.xml.gz served without Content-Encoding) is detected and inflated on the fly.
+
+    Only direct children of <url>/<sitemap> count, so Shopify's nested
+    <image:image><image:loc> CDN URLs are never mistaken for pages.
+    lastmod is the raw W3C datetime string, or "" when the entry has none.
+    Works with and without the standard sitemap namespace. Each entry is
+    cleared once read, so memory use doesn't grow with the document.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    state = {"root": None, "depth": 0}
+    inflate = None
+    fed = False
+    try:
+        for data in chunks:
+            if not data:
+                continue
+            if not fed and data[:2] == _GZIP_MAGIC:
+                inflate = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            fed = True
+            for piece in _inflate(inflate, data) if inflate else (data,):
+                parser.feed(piece)
+                yield from _read_entries(parser, state)
+        if fed:
+            parser.close()
+            yield from _read_entries(parser, state)
+    except (ET.ParseError, zlib.error) as e:
+        print(f"     XML parse error: {e}")
+
+
+def parse_entries(data: bytes) -> list[tuple[str, str]]:
+    """(loc, lastmod) for every entry of a sitemap document already in memory."""
+    return list(iter_entries([data]))
+
+
+def parse_locs(data: bytes) -> list[str]:
+    """Like parse_entries, but just the <loc> URLs."""
+    return [loc for loc, _ in parse_entries(data)]
+
+
+# ── Blocking fetch + parse (run in worker threads) ────────────────────────────
+def iter_sitemap(url: str, headers: Optional[dict] = None, retries: int = FETCH_RETRIES):
+    """Stream one sitemap and yield its (loc, lastmod) entries as they are parsed.
+    Retries only if the request fails before any entry was yielded."""
+    for attempt in range(1, retries + 1):
+        started = False
+        try:
+            with http_client.stream(url, headers or DEFAULT_HEADERS, FETCH_TIMEOUT) as resp:
+                for entry in iter_entries(resp.iter_chunks()):
+                    started = True
+                    yield entry
+            return
+        except urllib.error.HTTPError as e:
+            print(f"     HTTP {e.code} on {url}")
+        except Exception as e:
+            print(f"     Error fetching {url}: {e}")
+            if started:
+                return  # entries already handed out — a retry would repeat them
+        if attempt < retries:
+            time.sleep(2)
+
+
+def fetch_entries_cached(url: str, headers: Optional[dict] = None, retries: int = FETCH_RETRIES) -> list[tuple[str, str]]:
+    """Conditional GET through http_cache. The body is streamed into the cache and
+    hashed first; if it is unchanged since the last run (304, or a 200 with the same
+    hash) the stored parse is returned, otherwise the cached copy is parsed."""
+    for attempt in range(1, retries + 1):
+        try:
+            with http_cache.open_url(url, headers or DEFAULT_HEADERS, FETCH_TIMEOUT) as resp:
+                resp.save()
+                if resp.unchanged:
+                    cached = http_cache.parsed(url, resp.digest)
+                    if cached is not None:
+                        return [tuple(e) for e in cached]
+                entries = list(iter_entries(resp.chunks()))
+            http_cache.store_parsed(url, resp.digest, entries)
+            return entries
+        except urllib.error.HTTPError as e:
+            print(f"     HTTP {e.code} on {url}")
+        except Exception as e:
+            print(f"     Error fetching {url}: {e}")
+        if attempt < retries:
+            time.sleep(2)
+    return []
+
+
+# ── Concurrency control ───────────────────────────────────────────────────────
+class HostLimiter:
+    """Hands out one asyncio.Semaphore per hostname (created on first use)."""
+
+    def __init__(self, per_host: int = PER_HOST_CONCURRENCY):
+        self.per_host = per_host
+        self._sems: dict[str, asyncio.Semaphore] = {}
+
+    def __call__(self, url: str) -> asyncio.Semaphore:
+        host = (urlparse(url).hostname or "").lower()
+        if host not in self._sems:
+            self._sems[host] = asyncio.Semaphore(self.per_host)
+        return self._sems[host]
+
+
+# ── Async API ─────────────────────────────────────────────────────────────────
+async def fetch_entries(url: str, limiter: HostLimiter, headers: Optional[dict] = None) -> list[tuple[str, str]]:
+    """Fetch one sitemap (respecting the host limit) and return its (loc, lastmod) entries.
+    Unchanged sitemaps (304 / same body hash) are served from the http_cache parse."""
+    async with limiter(url):
+        return await asyncio.to_thread(fetch_entries_cached, url, headers)
+
+
+async def fetch_locs(url: str, limiter: HostLimiter, headers: Optional[dict] = None) -> list[str]:
+    """Fetch one sitemap (respecting the host limit) and return its <loc> entries."""
+    return [loc for loc, _ in await fetch_entries(url, limiter, headers)]
+
+
+async def sub_sitemaps(
+    root_url: str,
+    is_sub_sitemap: Callable[[str], bool],
+    limiter: HostLimiter,
+    headers: Optional[dict] = None,
+) -> list[str]:
+    """Fetch a root sitemap and return the sub-sitemap URLs that pass `is_sub_sitemap`."""
+    return [loc for loc in await fetch_locs(root_url, limiter, headers) if is_sub_sitemap(loc)]
+
+
+async def fetch_all(
+    sitemap_urls: list[str],
+    limiter: HostLimiter,
+    headers: Optional[dict] = None,
+    keep: Optional[Callable[[str], bool]] = None,
+    on_done: Optional[Callable[[str, list], None]] = None,
+) -> list[list[tuple[str, str]]]:
+    """Fetch many sitemaps concurrently. Returns one list of (loc, lastmod) entries
+    per input URL, in input order. `keep` filters on loc; `on_done(url, entries)`
+    is called as each sitemap finishes."""
+
+    async def one(url: str) -> list[tuple[str, str]]:
+        entries = await fetch_entries(url, limiter, headers)
+        if keep is not None:
+            entries = [e for e in entries if keep(e[0])]
+        if on_done is not None:
+            on_done(url, entries)
+        return entries
+
+    return list(await asyncio.gather(*(one(u) for u in sitemap_urls)))
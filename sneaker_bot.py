@@ -2,53 +2,88 @@ import time
 import json
 import os
 import re
+import sys
 import random
-import hashlib
-import unicodedata
 import datetime
+import functools
+import hashlib
+import threading
+import urllib.error
+from concurrent.futures import Future
 from urllib.parse import urlparse
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 
+import catalog_store
+import crawl_scheduler
+import driver_supervisor
+import extract_adapters
+import http_client
+import lean_browser
+import page_archive
+import page_ready
+import recrawl
+import resolver
+import run_journal
+import scrape_metrics
+from canonical import make_canonical_id, normalize_canonical, strip_style_codes as _strip_style_codes
+from page_snapshot import PageSnapshot, as_snapshot
+from parse_stage import ParseStage
+from result_writer import ResultWriter
+
 # ==========================================
 # 1. CONFIGURATION
 # ==========================================
-OUTPUT_FILE = "sneaker_dump.txt"
+CATALOG_DB  = catalog_store.CATALOG_DB   # local SQLite catalog, always written (SNEAKER_CATALOG_DB)
 MONGODB_URI = os.environ.get("MONGODB_URI", "")
 
-# MongoDB client — set up once if URI is available
+# Batch mode parallelism — one headless Chrome per worker, all pulling from one
+# crawl_scheduler that interleaves retailers. PER_HOST_LIMIT caps how many workers may
+# hit the same retailer at once; POLITE_DELAY is the gap a retailer gets after each of
+# its pages (raised by robots.txt Crawl-delay) — other stores are scraped meanwhile.
+BATCH_WORKERS  = max(1, int(os.environ.get("SNEAKER_WORKERS", "1")))
+PER_HOST_LIMIT = max(1, int(os.environ.get("SNEAKER_PER_HOST", "2")))
+POLITE_DELAY   = 2  # seconds
+
+# SNEAKER_ARCHIVE=1 keeps every scraped page in .page_archive/ so the catalog can be
+# re-extracted offline later with  python3 sneaker_bot.py --replay
+ARCHIVE_PAGES  = os.environ.get("SNEAKER_ARCHIVE", "") == "1"
+
+# Parse-stage processes for batch mode: browsers only capture HTML, extraction runs
+# in this many worker processes (0 = extract inline on the browser thread).
+PARSE_WORKERS  = max(0, int(os.environ.get("SNEAKER_PARSE_WORKERS",
+                                           str(min(BATCH_WORKERS, (os.cpu_count() or 1) - 1)))))
+
+# Unchanged items (same URL, price, name and thumbnail as the stored retailer link) only get
+# their link's scrapedAt bumped; SNEAKER_TOUCH_UNCHANGED=0 skips writing them at all.
+TOUCH_UNCHANGED = os.environ.get("SNEAKER_TOUCH_UNCHANGED", "1") != "0"
+
+# MongoDB client — set up once by main() if URI is available. Not at import time, so
+# parse-stage worker processes (which import this module) don't each open a connection.
 mongo_col = None
-try:
-    from pymongo import MongoClient, UpdateOne
-    if MONGODB_URI:
-        _client = MongoClient(MONGODB_URI)
-        mongo_col = _client["sneakopedia"]["sneakers"]  # same db/collection as the app
-        print(f"✅ MongoDB connected.")
-    else:
-        print("⚠️  MONGODB_URI not set — will save to file only.")
-except ImportError:
-    print("⚠️  pymongo not installed (pip install pymongo) — will save to file only.")
+
+
+def connect_mongo():
+    global mongo_col
+    if mongo_col is not None:
+        return mongo_col
+    try:
+        from pymongo import MongoClient
+        if MONGODB_URI:
+            client = MongoClient(MONGODB_URI)
+            mongo_col = client["sneakopedia"]["sneakers"]  # same db/collection as the app
+            print(f"✅ MongoDB connected.")
+        else:
+            print("⚠️  MONGODB_URI not set — will save to file only.")
+    except ImportError:
+        print("⚠️  pymongo not installed (pip install pymongo) — will save to file only.")
+    return mongo_col
 
 # ==========================================
 # 2. DEDUPLICATION HELPERS
 # ==========================================
 
-_NOISE_WORDS = {
-    'the', 'and', 'with', 'for', 'by', 'in', 'a', 'an',
-    # Jordan-line: "Jordan 1 Retro High" == "Jordan 1 High" at Indian retailers
-    'retro',
-    # Size/age suffixes that some retailers append
-    'gs', 'ps', 'td', 'bp', 'preschool', 'gradeschool', 'toddler',
-}
-
-_BRAND_PREFIXES = [
-    r'^nike\s+', r'^adidas\s+', r'^new balance\s+', r'^jordan brand\s+',
-    r'^converse\s+', r'^reebok\s+', r'^asics\s+', r'^puma\s+',
-    r'^vans\s+', r'^on running\s+', r'^hoka one one\s+', r'^hoka\s+',
-    r'^salomon\s+', r'^ugg\s+',
-]
-
 # Slug compound-word splitter — VNV (and some headless Shopify stores) join
 # the two halves of a colorway without a separator in the URL slug.
 # e.g. "For All Time Red/Puma White" → slug token "redpuma" or "pinkpuma".
@@ -66,21 +101,6 @@ _SLUG_SPLIT_TERMS = sorted([
 ], key=len, reverse=True)
 
 
-def _strip_style_codes(name: str) -> str:
-    """Remove retailer style codes from a display name.
-    Handles both formats:
-      letters-first: Dd8959, B75806, FZ5112, CW7891-001
-      digits-first:  162053c, 162056c  (Converse format)
-    Also cleans up an orphaned 3-digit suffix left by letters-first codes (e.g. " 100").
-    """
-    s = name
-    s = re.sub(r'\b[A-Za-z]{1,3}\d{4,6}(?:-\d{3})?\b', '', s)  # Nike/Adidas: Dd8959-100 (≥1 letter required)
-    s = re.sub(r'\b\d{4,6}-\d{3}\b', '', s)                      # pure digit-dash: 555088-101
-    s = re.sub(r'\b\d{5,6}[A-Za-z]{1,2}\b', '', s)               # Converse: 162053c (5+ digits keeps NB 2002R/1906D)
-    s = re.sub(r'\s\d{3}\b', '', s)                               # orphan: " 100"
-    return re.sub(r'\s+', ' ', s).strip()
-
-
 def _decompound_slug_token(word: str) -> str:
     """Split a single slug token that joins two colorway words without a separator.
     'redpuma' → 'Red/Puma',  'pinkpuma' → 'Pink/Puma',  'blackmauve' → 'Black/Mauve'
@@ -102,73 +122,72 @@ def slug_to_name(slug: str) -> str:
     return ' '.join(_decompound_slug_token(p) for p in slug.split('-'))
 
 
-_DOMAIN_TO_RETAILER = {
-    'crepdogcrew.com':              'Crepdog Crew',
-    'marketplace.mainstreet.co.in': 'Mainstreet',
-    'superkicks.in':                'Superkicks',
-    'vegnonveg.com':                'VegNonVeg',
-    'limitededt.in':                'LTD Edition',
-}
+def get_retailer_name(url: str) -> str:
+    """Map a product URL to its canonical retailer display name (see resolver.RETAILERS)."""
+    return resolver.resolve_retailer(url)
 
 
-def normalize_canonical(name: str) -> str:
-    """Return a stable lowercase ASCII key for matching the same shoe across retailers."""
-    s = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
-    s = s.lower()
-    for pat in _BRAND_PREFIXES:
-        s = re.sub(pat, '', s, count=1)
-    # Strip style codes like DH7138-006, FZ5112 (require ≥1 letter so NB model
-    # numbers like 1000/9060/2002 are NOT stripped — they have no letter prefix)
-    s = re.sub(r'\b[a-z]{1,3}\d{4,6}(?:-\d{3})?\b', '', s)
-    # Also strip pure digit-dash codes like 555088-101
-    s = re.sub(r'\b\d{4,6}-\d{3}\b', '', s)
-    # Digits-first codes like 162053c (Converse) — 5+ digits to preserve NB 2002R/1906D
-    s = re.sub(r'\b\d{5,6}[a-z]{1,2}\b', '', s)
-    s = re.sub(r'\([^)]*\)', '', s)   # strip (2015), (W)
-    s = re.sub(r'\[[^\]]*\]', '', s)  # strip [restock]
-    s = s.replace("'", '').replace('"', '')
-    s = re.sub(r'[^a-z0-9\s]', ' ', s)
-    s = re.sub(r'\s+', ' ', s).strip()
-    tokens = [t for t in s.split() if t and t not in _NOISE_WORDS]
-    return ' '.join(tokens)
-
-
-def make_canonical_id(canonical: str, brand: str) -> str:
-    """Deterministic MongoDB _id from canonical name + brand. Prefix 'c_' distinguishes
-    from legacy random 's_' IDs so old documents are never accidentally overwritten."""
-    key = f"{brand.lower().strip()}||{canonical}"
-    return 'c_' + hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+def item_fingerprint(item) -> str:
+    """Hash of the scraped fields a catalog write depends on: URL, price, name, thumbnail."""
+    key = "\x1f".join(str(item.get(f) or '') for f in ('url', 'retailPrice', 'shoeName', 'thumbnail'))
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
 
 
-def get_retailer_name(url: str) -> str:
-    """Map a product URL to its canonical retailer display name."""
-    try:
-        host = urlparse(url).hostname or ''
-        host = host.replace('www.', '')
-        for domain, name in _DOMAIN_TO_RETAILER.items():
-            if domain in host:
-                return name
-    except Exception:
-        pass
-    return 'Unknown'
+def _stored_fingerprints(col, doc_ids) -> dict:
+    """{(doc_id, retailer): fingerprint} for the retailer links already in MongoDB —
+    one query for the whole batch."""
+    stored = {}
+    cursor = col.find({"_id": {"$in": list(doc_ids)}},
+                      {"retailerLinks.retailer": 1, "retailerLinks.fp": 1})
+    for doc in cursor:
+        for link in doc.get("retailerLinks") or []:
+            if isinstance(link, dict) and link.get("fp"):
+                stored[(doc["_id"], link.get("retailer"))] = link["fp"]
+    return stored
 
 
 def save_to_mongo(results: list, col) -> None:
     """
     Upsert scraped items using canonicalName+brand as the match key.
-    Two-pass bulk_write: MongoDB forbids $pull and $push on the same field
-    in a single update, so we remove the stale retailer entry in pass 1
-    and insert the fresh entry in pass 2.
+    One pipeline-style update per item, all in a single bulk_write: the
+    retailer's old entry in retailerLinks is replaced by the fresh one and
+    retailPrice is recomputed as the lowest price across the resulting links,
+    so it can go back up when a retailer raises its price.
+    Pipeline updates need MongoDB 4.2+ (Atlas is).
+
+    Each link stores a fingerprint of its item (item_fingerprint). Items whose
+    fingerprint matches the stored link — most of a daily refresh — skip the
+    rebuild: their link's scrapedAt is touched (or, with TOUCH_UNCHANGED off,
+    nothing is written).
     """
     from pymongo import UpdateOne
 
-    pass1, pass2 = [], []
+    rows = []
     for item in results:
         canonical = normalize_canonical(item['shoeName'])
         if not canonical:
             continue
-        doc_id   = make_canonical_id(canonical, item['brand'])
-        retailer = get_retailer_name(item['url'])
+        doc_id = make_canonical_id(canonical, item['brand'])
+        rows.append((item, canonical, doc_id, get_retailer_name(item['url'])))
+
+    stored = _stored_fingerprints(col, {doc_id for _, _, doc_id, _ in rows}) if rows else {}
+    now = datetime.datetime.utcnow()
+
+    ops = []
+    unchanged = 0
+    for item, canonical, doc_id, retailer in rows:
+        fp = item_fingerprint(item)
+        if stored.get((doc_id, retailer)) == fp:
+            unchanged += 1
+            if TOUCH_UNCHANGED:
+                ops.append(UpdateOne(
+                    {"_id": doc_id, "retailerLinks.retailer": retailer},
+                    {"$set": {"retailerLinks.$.scrapedAt": now}},
+                ))
+            continue
+        # Two items in one batch for the same doc and retailer: the later one wins
+        stored[(doc_id, retailer)] = fp
+
         try:
             source = urlparse(item['url']).hostname.replace('www.', '')
         except Exception:
@@ -178,43 +197,53 @@ def save_to_mongo(results: list, col) -> None:
             "retailer":  retailer,
             "url":       item['url'],
             "price":     item['retailPrice'],
-            "scrapedAt": datetime.datetime.utcnow(),
+            "scrapedAt": now,
             "source":    source,
+            "fp":        fp,
         }
 
-        # Pass 1: upsert document + pull stale retailer entry
-        pass1.append(UpdateOne(
+        # Scraped values are wrapped in $literal so a name or URL starting with
+        # "$" is never read as a field path. $ifNull stands in for $setOnInsert,
+        # which pipeline updates don't support.
+        ops.append(UpdateOne(
             {"_id": doc_id},
-            {
-                "$set": {
-                    "canonicalName": canonical,
-                    "brand":         item['brand'],
-                    "currency":      item.get('currency', 'INR'),
-                },
-                "$setOnInsert": {
-                    "_id":       doc_id,
-                    "shoeName":  item['shoeName'],
-                    "thumbnail": item.get('thumbnail', ''),
-                    "rand":      random.random(),
-                },
-                "$min": {"retailPrice": item['retailPrice']},
-                "$pull": {"retailerLinks": {"retailer": retailer}},
-            },
+            [
+                {"$set": {
+                    "canonicalName": {"$literal": canonical},
+                    "brand":         {"$literal": item['brand']},
+                    "currency":      {"$literal": item.get('currency', 'INR')},
+                    "shoeName":      {"$ifNull": ["$shoeName",  {"$literal": item['shoeName']}]},
+                    "thumbnail":     {"$ifNull": ["$thumbnail", {"$literal": item.get('thumbnail', '')}]},
+                    "rand":          {"$ifNull": ["$rand",      {"$literal": random.random()}]},
+                    "retailerLinks": {"$concatArrays": [
+                        {"$filter": {
+                            "input": {"$ifNull": ["$retailerLinks", []]},
+                            "as":    "link",
+                            "cond":  {"$ne": ["$$link.retailer", {"$literal": retailer}]},
+                        }},
+                        [{"$literal": link_doc}],
+                    ]},
+                }},
+                {"$set": {"retailPrice": {"$min": "$retailerLinks.price"}}},
+            ],
             upsert=True,
         ))
 
-        # Pass 2: push fresh retailer entry
-        pass2.append(UpdateOne(
-            {"_id": doc_id},
-            {"$push": {"retailerLinks": link_doc}},
-        ))
-
-    if pass1:
-        col.bulk_write(pass1, ordered=False)
-    if pass2:
-        res = col.bulk_write(pass2, ordered=False)
-        inserted = sum(1 for op in pass1 if op)  # approximate
-        print(f"✅ MongoDB: {res.modified_count} updated, {len(pass2)} retailer links written.")
+    changed = len(rows) - unchanged
+    if ops:
+        t0 = time.monotonic()
+        try:
+            res = col.bulk_write(ops, ordered=False)
+        except Exception as e:
+            scrape_metrics.mongo_write(len(ops), time.monotonic() - t0, error=str(e))
+            raise
+        scrape_metrics.mongo_write(len(ops), time.monotonic() - t0,
+                                   res.upserted_count, res.modified_count, unchanged)
+        print(f"✅ MongoDB: {res.upserted_count} new, {res.modified_count} updated, "
+              f"{changed} retailer links written, {unchanged} unchanged.")
+    elif unchanged:
+        scrape_metrics.mongo_write(0, 0.0, unchanged=unchanged)
+        print(f"✅ MongoDB: {unchanged} unchanged — nothing to write.")
 
 
 # ==========================================
@@ -225,7 +254,9 @@ def setup_driver():
     options.add_argument("--headless") # Runs in background
     options.add_argument("--window-size=1920,1080")
     options.add_argument("user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+    lean_browser.apply_options(options)  # eager load, no images/fonts/trackers (SNEAKER_LEAN=0 to disable)
     driver = webdriver.Chrome(options=options)
+    lean_browser.enable(driver)
     return driver
 
 # ==========================================
@@ -251,6 +282,34 @@ _STORE_SUFFIXES = [
     ' | Shopify',
 ]
 
+# var product = {...} / let googleProductViewed = {...} GTM data layer blocks
+_GTM_RE = re.compile(r'(?:var product|let google\w+)\s*=\s*(\{[^;]{20,2000}\})', re.DOTALL)
+
+_PRICE_META_SELECTORS = [
+    "meta[property='product:price:amount']",
+    "meta[property='og:price:amount']",
+    "meta[itemprop='price']",
+]
+
+_PRICE_SELECTORS = [
+    ".price-item--sale",
+    ".price-item--regular",
+    ".price__current",
+    ".product__price",
+    ".product-meta__price",
+    "[data-product-price]",
+    "[data-price]",
+]
+_GENERIC_PRICE_SELECTORS = [".price"]   # any element with that class — a guess, never learned
+
+_NAME_SELECTORS = [
+    "h1.product-meta__title",
+    "h1.product__title",
+    "h1[class*='product']",
+    "h1[itemprop='name']",
+]
+_GENERIC_NAME_SELECTORS = ["h1"]
+
 def _parse_price_str(raw):
     """Convert a raw price string like '17,999.00' or '17999' to int. Returns 0 on failure."""
     try:
@@ -262,24 +321,24 @@ def _parse_price_str(raw):
         pass
     return 0
 
-def extract_gtm_product(driver):
+def extract_gtm_product(source):
     """
     Extract full product data from Google Tag Manager data layer scripts.
     Pattern: var product = {"name":...,"price":...,"brand":...,"image":...}
     Used by custom headless frontends (e.g. VegNonVeg) that don't expose
     price in standard meta tags or JSON-LD.
+    `source` is a PageSnapshot, raw HTML string or WebDriver; the result is
+    cached on the snapshot so repeat calls for the same page are free.
     Returns a dict with any of: name, price, brand, image — or {} if not found.
     """
+    snap = as_snapshot(source)
+    if 'gtm' in snap.memo:
+        return snap.memo['gtm']
     best = {}
     try:
-        scripts = driver.find_elements(By.TAG_NAME, "script")
-        for script in scripts:
-            content = script.get_attribute('innerHTML') or ''
+        for content in snap.scripts:
             # Match: var product = { ... } or let googleProductViewed = { ... }
-            for m in re.finditer(
-                r'(?:var product|let google\w+)\s*=\s*(\{[^;]{20,2000}\})',
-                content, re.DOTALL
-            ):
+            for m in _GTM_RE.finditer(content):
                 try:
                     data = json.loads(m.group(1))
                 except Exception:
@@ -302,90 +361,70 @@ def extract_gtm_product(driver):
                         best['image'] = str(data['image']).split('?')[0]
     except Exception:
         pass
+    snap.memo['gtm'] = best
     return best
 
 
-def extract_price(driver):
-    """
-    Priority-based price extraction:
-      0. GTM data layer (custom headless frontends like VegNonVeg)
-      1. JSON-LD Product offers.price  (most accurate)
-      2. Meta product:price:amount / og:price:amount
-      3. Shopify price CSS selectors
-      4. Body text scan — EMI lines filtered out first
-    Returns int rupees, or 0 if not found.
-    """
-    # 0. GTM data layer (highest priority for custom frontends)
-    gtm = extract_gtm_product(driver)
-    if gtm.get('price'):
-        return gtm['price']
+def _ld_json_products(snap):
+    """JSON-LD entries with @type Product, in document order."""
+    return [e for e in snap.ld_json if isinstance(e, dict) and e.get('@type') == 'Product']
 
-    # 1. JSON-LD
-    try:
-        scripts = driver.find_elements(By.CSS_SELECTOR, "script[type='application/ld+json']")
-        for script in scripts:
-            try:
-                data = json.loads(script.get_attribute('innerHTML') or '{}')
-                offers = None
-                if isinstance(data, list):
-                    for entry in data:
-                        if isinstance(entry, dict) and entry.get('@type') == 'Product':
-                            offers = entry.get('offers', {})
-                            break
-                elif data.get('@type') == 'Product':
-                    offers = data.get('offers', {})
-                if offers:
-                    if isinstance(offers, list):
-                        offers = offers[0]
-                    price = _parse_price_str(offers.get('price', '0'))
-                    if price:
-                        return price
-            except Exception:
-                pass
-    except Exception:
-        pass
 
-    # 2. Meta price tags
-    for selector in [
-        "meta[property='product:price:amount']",
-        "meta[property='og:price:amount']",
-        "meta[itemprop='price']",
-    ]:
-        try:
-            meta = driver.find_element(By.CSS_SELECTOR, selector)
-            price = _parse_price_str(meta.get_attribute('content'))
-            if price:
-                return price
-        except Exception:
-            pass
+# ── Extraction stages ─────────────────────────────────────────────────────────
+# Each field is extracted by a chain of (stage name, fn(snap)) tried in order until
+# one returns a truthy value. extract_adapters remembers which stage wins per host,
+# so extract_product() can try that one first and skip the rest of the chain.
 
-    # 3. Shopify / common price CSS selectors
-    PRICE_SELECTORS = [
-        ".price-item--sale",
-        ".price-item--regular",
-        ".price__current",
-        ".product__price",
-        ".product-meta__price",
-        "[data-product-price]",
-        "[data-price]",
-        ".price",
-    ]
-    for sel in PRICE_SELECTORS:
+def _price_from_gtm(snap):
+    return extract_gtm_product(snap).get('price', 0)
+
+
+def _price_from_ld_json(snap):
+    for entry in _ld_json_products(snap):
         try:
-            el = driver.find_element(By.CSS_SELECTOR, sel)
-            text = el.text.strip()
-            # Only accept lines that look like a price (contain ₹ or digits)
-            nums = re.findall(r'[\d,]+', text.replace(',', ''))
-            for n in nums:
-                price = _parse_price_str(n)
+            offers = entry.get('offers', {})
+            if offers:
+                if isinstance(offers, list):
+                    offers = offers[0]
+                price = _parse_price_str(offers.get('price', '0'))
                 if price:
                     return price
         except Exception:
             pass
+    return 0
+
+
+def _price_from_meta(snap):
+    for selector in _PRICE_META_SELECTORS:
+        price = _parse_price_str(snap.meta(selector))
+        if price:
+            return price
+    return 0
 
-    # 4. Body text fallback — strip EMI lines first
+
+def _price_from_css(snap, selectors=_PRICE_SELECTORS):
+    for sel in selectors:
+        el = snap.select_one(sel)
+        if el is None:
+            continue
+        text = el.text.strip()
+        # Only accept lines that look like a price (contain ₹ or digits)
+        nums = re.findall(r'[\d,]+', text.replace(',', ''))
+        for n in nums:
+            price = _parse_price_str(n)
+            if price:
+                return price
+    return 0
+
+
+def _price_from_css_generic(snap):
+    return _price_from_css(snap, _GENERIC_PRICE_SELECTORS)
+
+
+def _price_from_body_text(snap):
+    # Strip EMI lines first
     try:
-        body_text = driver.find_element(By.TAG_NAME, "body").text
+        body_text = snap.body_text
         clean_lines = []
         for line in body_text.split('\n'):
             low = line.lower()
@@ -418,11 +457,142 @@ def extract_price(driver):
             return min(all_prices)
     except Exception:
         pass
-
     return 0
 
 
-def extract_name(driver):
+def _name_from_gtm(snap):
+    return extract_gtm_product(snap).get('name', '')
+
+
+def _name_from_og_title(snap):
+    name = snap.meta("meta[property='og:title']")
+    if name and len(name) > 4:
+        for suffix in _STORE_SUFFIXES:
+            name = name.replace(suffix, '')
+        return name.strip(' -–|')
+    return ''
+
+
+def _name_from_ld_json(snap):
+    for entry in _ld_json_products(snap):
+        name = str(entry.get('name') or '').strip()
+        if name and len(name) > 4:
+            return name
+    return ''
+
+
+def _name_from_css(snap, selectors=_NAME_SELECTORS):
+    for sel in selectors:
+        el = snap.select_one(sel)
+        if el is None:
+            continue
+        name = el.text.strip()
+        if name and len(name) > 4:
+            return name
+    return ''
+
+
+def _name_from_css_generic(snap):
+    return _name_from_css(snap, _GENERIC_NAME_SELECTORS)
+
+
+def _name_from_title(snap):
+    title = snap.title
+    for sep in [' | ', ' – ', ' - ', ' — ']:
+        title = title.split(sep)[0]
+    return title.strip()
+
+
+def _image_from_gtm(snap):
+    return extract_gtm_product(snap).get('image', '')
+
+
+def _image_from_og_image(snap):
+    meta_img = snap.select_one("meta[property='og:image']")
+    return (meta_img.get("content") or "") if meta_img is not None else ""
+
+
+def _image_from_img_width(snap):
+    for img in snap.select("img"):
+        try:
+            w = img.get("width")
+            if w and int(w) > 400:
+                return img.get("src") or ""
+        except ValueError:
+            pass
+    return ""
+
+
+def _brand_from_gtm(snap):
+    return extract_gtm_product(snap).get('brand', '')
+
+
+_PRICE_CHAIN = (
+    ('gtm',         _price_from_gtm),
+    ('ld_json',     _price_from_ld_json),
+    ('meta',        _price_from_meta),
+    ('css',         _price_from_css),
+    ('css_generic', _price_from_css_generic),
+    ('body_text',   _price_from_body_text),
+)
+_NAME_CHAIN = (
+    ('og_title',    _name_from_og_title),
+    ('ld_json',     _name_from_ld_json),
+    ('css',         _name_from_css),
+    ('css_generic', _name_from_css_generic),
+    ('title',       _name_from_title),
+)
+_IMAGE_CHAIN = (
+    ('gtm',       _image_from_gtm),
+    ('og_image',  _image_from_og_image),
+    ('img_width', _image_from_img_width),
+)
+
+# Field → chain used by extract_product (the GTM data layer goes first for every field)
+_FIELD_CHAINS = {
+    'name':  (('gtm', _name_from_gtm),) + _NAME_CHAIN,
+    'price': _PRICE_CHAIN,
+    'image': _IMAGE_CHAIN,
+    'brand': (('gtm', _brand_from_gtm),),
+}
+
+
+def _run_chain(snap, chain, first=None):
+    """(value, stage) from the first stage that hits, trying stage `first` before the
+    rest of the chain. Stage is '' when nothing hit; value is then the last stage's.
+    Only a precise stage may go first — anything else runs the chain in its normal order."""
+    value = None
+    if first not in extract_adapters.PRECISE_STAGES:
+        first = None
+    if first:
+        for stage, fn in chain:
+            if stage == first:
+                value = fn(snap)
+                if value:
+                    return value, stage
+    for stage, fn in chain:
+        if stage != first:
+            value = fn(snap)
+            if value:
+                return value, stage
+    return value, ''
+
+
+def extract_price(source):
+    """
+    Priority-based price extraction:
+      0. GTM data layer (custom headless frontends like VegNonVeg)
+      1. JSON-LD Product offers.price  (most accurate)
+      2. Meta product:price:amount / og:price:amount
+      3. Shopify price CSS selectors, then the generic .price
+      4. Body text scan — EMI lines filtered out first
+    `source` is a PageSnapshot, raw HTML string or WebDriver.
+    Returns int rupees, or 0 if not found.
+    """
+    return _run_chain(as_snapshot(source), _PRICE_CHAIN)[0] or 0
+
+
+def extract_name(source):
     """
     Priority-based name extraction:
       1. og:title meta tag  (product-specific, already cleaned by the store)
@@ -430,209 +600,272 @@ def extract_name(driver):
       3. Shopify / product-specific h1 CSS selectors
       4. Generic h1
       5. Page title (stripped of store suffix)
+    `source` is a PageSnapshot, raw HTML string or WebDriver.
     Returns a string.
     """
-    # 1. og:title
-    try:
-        meta = driver.find_element(By.CSS_SELECTOR, "meta[property='og:title']")
-        name = (meta.get_attribute('content') or '').strip()
-        if name and len(name) > 4:
-            for suffix in _STORE_SUFFIXES:
-                name = name.replace(suffix, '')
-            name = name.strip(' -–|')
-            if name:
-                return name
-    except Exception:
-        pass
+    return _run_chain(as_snapshot(source), _NAME_CHAIN)[0] or ''
 
-    # 2. JSON-LD Product name
-    try:
-        scripts = driver.find_elements(By.CSS_SELECTOR, "script[type='application/ld+json']")
-        for script in scripts:
-            try:
-                data = json.loads(script.get_attribute('innerHTML') or '{}')
-                entries = data if isinstance(data, list) else [data]
-                for entry in entries:
-                    if isinstance(entry, dict) and entry.get('@type') == 'Product':
-                        name = (entry.get('name') or '').strip()
-                        if name and len(name) > 4:
-                            return name
-            except Exception:
-                pass
-    except Exception:
-        pass
 
-    # 3. Product-specific h1 selectors (Shopify / Dawn theme / common patterns)
-    for sel in [
-        "h1.product-meta__title",
-        "h1.product__title",
-        "h1[class*='product']",
-        "h1[itemprop='name']",
-    ]:
-        try:
-            el = driver.find_element(By.CSS_SELECTOR, sel)
-            name = el.text.strip()
-            if name and len(name) > 4:
-                return name
-        except Exception:
-            pass
+def extract_image(source):
+    """
+    Product image URL:
+      1. GTM data layer image
+      2. og:image meta tag
+      3. First <img> wider than 400px
+    `source` is a PageSnapshot, raw HTML string or WebDriver. Returns '' if not found.
+    """
+    return _run_chain(as_snapshot(source), _IMAGE_CHAIN)[0] or ''
 
-    # 4. Generic h1
-    try:
-        name = driver.find_element(By.TAG_NAME, "h1").text.strip()
-        if name and len(name) > 4:
-            return name
-    except Exception:
-        pass
 
-    # 5. Page title fallback
-    title = driver.title
-    for sep in [' | ', ' – ', ' - ', ' — ']:
-        title = title.split(sep)[0]
-    return title.strip()
+def extract_product(source):
+    """
+    Run every extractor against one page snapshot.
+    Returns a dict with name, price, image and brand (brand is '' unless the
+    page states it explicitly — e.g. the GTM data layer's "ASICS"), plus
+    'stages': the stage each field came from, for extract_adapters.record().
+    For a host with a learned adapter, that stage is tried before the generic chain.
+    """
+    snap = as_snapshot(source)
+    fields = {}
+    stages = {}
+    for field, chain in _FIELD_CHAINS.items():
+        first = extract_adapters.preferred(snap.url, field) if snap.url else None
+        value, stages[field] = _run_chain(snap, chain, first)
+        fields[field] = value or (0 if field == 'price' else '')
+    fields['stages'] = stages
+    return fields
 
 
 def normalize_brand(text, url=""):
     """
     Detect brand from shoe name text + optional product URL.
-    URL-based detection handles D2C brands whose product names don't contain the brand name
-    (e.g. Comet sells "X Lows FLAMINGO", Thaely sells "Sneaker 01").
+    Rules live in resolver.py (BRAND_HOSTS for D2C domains, BRAND_RULES for keywords).
     """
-    # --- URL/domain-based detection (highest priority for D2C brands) ---
-    url_lower = url.lower()
-    if 'wearcomet.com'    in url_lower: return 'Comet'
-    if 'thaely.com'       in url_lower: return 'Thaely'
-    if 'gullylabs.com'    in url_lower: return 'Gully Labs'
-    if 'gullylabs.in'     in url_lower: return 'Gully Labs'
-    if '7-10.in'          in url_lower: return '7-10'
-    if 'baccabucci.com'   in url_lower: return 'Bacca Bucci'
-
-    text = text.lower()
-
-    # --- Collabs / sub-brands (before parent brands) ---
-    if 'yeezy'            in text: return 'Yeezy'
-    if 'jordan'           in text: return 'Jordan'
-    if 'on x loewe'       in text: return 'On Running'
-    if 'naked wolfe'      in text: return 'Naked Wolfe'
-    if 'louis vuitton'    in text: return 'Louis Vuitton'
-
-    # --- Global brands ---
-    if 'nike'             in text: return 'Nike'
-    if 'adidas'           in text: return 'Adidas'
-    if 'new balance'      in text: return 'New Balance'
-    if 'converse'         in text: return 'Converse'
-    if 'reebok'           in text: return 'Reebok'
-    if 'under armour'     in text: return 'Under Armour'
-    if 'asics'            in text: return 'Asics'
-    if 'anta'             in text: return 'Anta'
-    if 'brooks'           in text: return 'Brooks Running'
-    if 'dior'             in text: return 'Dior'
-    if 'fila'             in text: return 'Fila'
-    if 'hoka'             in text: return 'Hoka'
-    if 'li-ning'          in text: return 'Li-Ning'
-    if 'onitsuka'         in text: return 'Onitsuka Tiger'
-    if 'puma'             in text: return 'Puma'
-    if 'salomon'          in text: return 'Salomon'
-    if 'ugg'              in text: return 'UGG'
-    if 'vans'             in text: return 'Vans'
-    if 'crocs'            in text: return 'Crocs'
-    if 'on running'       in text: return 'On Running'
-
-    # Guard: "cloud" alone is too generic — only match if paired with "on" context
-    # (avoid false match on "Air Max Cloud" etc.)
-    if re.search(r'\bon cloud\b|\bcloudmonster\b|\bcloudnova\b|\bcloudflow\b', text):
-        return 'On Running'
-
-    # --- Indian D2C brands (text-based, when URL unavailable) ---
-    if 'comet'            in text: return 'Comet'
-    if 'thaely'           in text: return 'Thaely'
-    if 'gully'            in text: return 'Gully Labs'
-    if 'bacca bucci'      in text: return 'Bacca Bucci'
-
-    return 'Streetwear'
+    return resolver.resolve_brand(text, url)
 
 # ==========================================
 # 4. SINGLE PRODUCT SCRAPER
 # ==========================================
+
+# Standard Shopify storefronts serve every product as JSON at <product-url>.js
+# (title, vendor, price in paise, images) — no browser needed for these hosts.
+# VegNonVeg is left out: its headless frontend doesn't expose the endpoint.
+_SHOPIFY_JSON_HOSTS = (
+    'crepdogcrew.com',
+    'marketplace.mainstreet.co.in',
+    'superkicks.in',
+    'limitededt.in',
+)
+_HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept":     "application/json",
+}
+SHOPIFY_JSON_TIMEOUT = 10
+
+
+def fetch_shopify_product(url):
+    """
+    HTTP-only fast path for standard Shopify stores.
+    Fetches <product-url>.js and maps it to the same fields the page extractors produce.
+    Returns a dict with any of: name, price, brand, image — or {} if the endpoint
+    is unavailable (non-Shopify host, 404, bot wall, malformed JSON).
+    """
+    host = (urlparse(url).hostname or '').replace('www.', '')
+    if '/products/' not in url or not any(host.endswith(h) for h in _SHOPIFY_JSON_HOSTS):
+        return {}
+
+    json_url = url.split('?')[0].split('#')[0].rstrip('/')
+    if not json_url.endswith('.js'):
+        json_url += '.js'
+
+    try:
+        with scrape_metrics.span(url, "shopify_json"):
+            raw = http_client.get(json_url, _HTTP_HEADERS, SHOPIFY_JSON_TIMEOUT).body
+        scrape_metrics.add_decoded_bytes(url, len(raw))
+        body = raw.decode('utf-8')
+        best = parse_shopify_product(body)
+    except urllib.error.HTTPError as e:
+        if e.code in (429, 503):
+            crawl_scheduler.retry_after(url, e.headers.get('Retry-After'))
+        return {}
+    except Exception:
+        return {}
+    if best and ARCHIVE_PAGES:
+        page_archive.store(url, body, kind=page_archive.SHOPIFY)
+    return best
+
+
+def parse_shopify_product(body):
+    """Map a Shopify .js product JSON body to name, price, brand and image ({} if not a product)."""
+    data = json.loads(body)
+    if not isinstance(data, dict):
+        return {}
+
+    best = {}
+    title = str(data.get('title') or '').strip()
+    if len(title) > 4:
+        best['name'] = title
+    # Shopify's .js endpoint reports prices in the smallest currency unit (paise)
+    raw_price = data.get('price') or data.get('price_min')
+    if isinstance(raw_price, (int, float)) and raw_price > 0:
+        p = _parse_price_str(raw_price / 100)
+        if p:
+            best['price'] = p
+    vendor = str(data.get('vendor') or '').strip()
+    if len(vendor) > 1:
+        best['brand'] = vendor
+    image = data.get('featured_image') or next(iter(data.get('images') or []), '')
+    if isinstance(image, dict):
+        image = image.get('src', '')
+    if image:
+        best['image'] = str(image)
+    return best
+
+
+def _build_item(url, name, price, img_src, brand=None):
+    """Clean up raw extracted fields and assemble the item dict save_to_mongo expects.
+    Returns None (after printing the skip reason) when the thumbnail or price is missing."""
+    # --- SLUG ENRICHMENT ---
+    # VNV (and some custom Shopify frontends) only put the silhouette in og:title/GTM
+    # (e.g. "SPEEDCAT PLUS") — the colorway lives only in the URL slug.
+    # If the slug-derived name is meaningfully longer, use it so every colorway
+    # gets its own canonical ID rather than all collapsing into one document.
+    if '/products/' in url:
+        raw_slug = url.split('/products/')[-1].split('?')[0]
+        slug_name = slug_to_name(raw_slug)
+        slug_name = _strip_style_codes(slug_name)
+        if len(slug_name) > len(name) + 10:
+            name = slug_name
+
+    # Strip style codes from the final display name regardless of source
+    # (some retailers include codes like "162053c" or "Dd8959" in og:title)
+    name = _strip_style_codes(name)
+
+    # Clean image URL
+    if img_src and img_src.startswith("//"): img_src = "https:" + img_src
+    if img_src and "?" in img_src: img_src = img_src.split("?")[0]
+
+    # Source domain for description
+    try:
+        source_domain = urlparse(url).netloc.replace("www.", "")
+    except Exception:
+        source_domain = url
+
+    brand = brand or normalize_brand(name, url=url)
+
+    item = {
+        "_id":         f"s_{random.randint(10000,99999)}_{int(time.time())}",
+        "shoeName":    name,
+        "brand":       brand,
+        "retailPrice": price,
+        "currency":    "INR",
+        "thumbnail":   img_src,
+        "url":         url,
+        "description": f"Sourced from {source_domain}",
+        "rand":        random.random(),
+    }
+
+    if item.get("thumbnail") and item.get("retailPrice") > 0:
+        print(f"   + Found: {item['shoeName']} (₹{item['retailPrice']})")
+        return item
+    else:
+        print(f"   x Skipped (missing data — name: '{name}', price: {price}): {url}")
+        return None
+
+
 def scrape_single_product(driver, url):
-    """Scrapes a specific product page."""
-    driver.get(url)
-    time.sleep(5)
+    """Scrapes a specific product page.
+    Shopify stores are tried over plain HTTP first; the browser is only used
+    when the .js endpoint is missing or incomplete."""
+    html, item = capture_product(driver, url)
+    if html is None:
+        return item
+    return parse_product_page(url, html)
+
+
+def capture_product(driver, url):
+    """Browser half of scrape_single_product — no page parsing happens here.
+    Returns (None, item) when the Shopify fast path answered, (html, None) for a
+    captured page that still needs parse_product_page(), or (None, None) on error."""
+    shop = fetch_shopify_product(url)
+    if _shopify_complete(shop):
+        return None, _item_from_shopify(url, shop)
+
+    wait = crawl_scheduler.cooldown_left(url)
+    if wait:
+        time.sleep(wait)  # the store just sent a Retry-After on the .js request
+    with scrape_metrics.span(url, "navigate"):
+        lean_browser.get(driver, url)
+    with scrape_metrics.span(url, "wait"):
+        page_ready.wait_until_ready(driver, url)
 
     try:
-        # GTM data layer first — gives us name, price, brand, image in one shot
-        # for headless frontends (VegNonVeg, etc.) that don't use standard meta tags
-        gtm = extract_gtm_product(driver)
-
-        name  = gtm.get('name') or extract_name(driver)
-        price = gtm.get('price') or extract_price(driver)
-
-        # --- SLUG ENRICHMENT ---
-        # VNV (and some custom Shopify frontends) only put the silhouette in og:title/GTM
-        # (e.g. "SPEEDCAT PLUS") — the colorway lives only in the URL slug.
-        # If the slug-derived name is meaningfully longer, use it so every colorway
-        # gets its own canonical ID rather than all collapsing into one document.
-        if '/products/' in url:
-            raw_slug = url.split('/products/')[-1].split('?')[0]
-            slug_name = slug_to_name(raw_slug)
-            slug_name = _strip_style_codes(slug_name)
-            if len(slug_name) > len(name) + 10:
-                name = slug_name
-
-        # Strip style codes from the final display name regardless of source
-        # (some retailers include codes like "162053c" or "Dd8959" in og:title)
-        name = _strip_style_codes(name)
-
-        # --- IMAGE (Meta Strategy) ---
-        img_src = gtm.get('image', "")
-        if not img_src:
-            try:
-                meta_img = driver.find_element(By.CSS_SELECTOR, "meta[property='og:image']")
-                img_src = meta_img.get_attribute("content")
-            except Exception:
-                try:
-                    imgs = driver.find_elements(By.TAG_NAME, "img")
-                    for i in imgs:
-                        w = i.get_attribute("width")
-                        if w and int(w) > 400:
-                            img_src = i.get_attribute("src")
-                            break
-                except Exception:
-                    pass
+        # One page_source pull — every extractor runs against the in-memory snapshot
+        with scrape_metrics.span(url, "capture"):
+            html = driver.page_source
+        scrape_metrics.add_decoded_bytes(url, len(html.encode('utf-8')))
+        if ARCHIVE_PAGES:
+            page_archive.store(url, html)
+        return html, None
 
-        # Clean image URL
-        if img_src and img_src.startswith("//"): img_src = "https:" + img_src
-        if img_src and "?" in img_src: img_src = img_src.split("?")[0]
+    except Exception as e:
+        if driver_supervisor.is_dead_session(e):
+            raise  # let the supervisor restart Chrome and retry this URL
+        print(f"   x Error: {e}")
+        return None, None
 
-        # Source domain for description
-        try:
-            from urllib.parse import urlparse
-            source_domain = urlparse(url).netloc.replace("www.", "")
-        except Exception:
-            source_domain = url
-
-        # GTM provides the canonical brand name (e.g. "ASICS") — use it if available
-        brand = gtm.get('brand') or normalize_brand(name, url=url)
-
-        item = {
-            "_id":         f"s_{random.randint(10000,99999)}_{int(time.time())}",
-            "shoeName":    name,
-            "brand":       brand,
-            "retailPrice": price,
-            "currency":    "INR",
-            "thumbnail":   img_src,
-            "url":         url,
-            "description": f"Sourced from {source_domain}",
-            "rand":        random.random(),
-        }
 
-        if item.get("thumbnail") and item.get("retailPrice") > 0:
-            print(f"   + Found: {item['shoeName']} (₹{item['retailPrice']})")
-            return item
-        else:
-            print(f"   x Skipped (missing data — name: '{name}', price: {price}): {url}")
-            return None
+def parse_product_page(url, html):
+    """Extraction half of scrape_single_product. Pure CPU, no driver — runs in the
+    parse stage's worker processes in batch mode."""
+    try:
+        t0 = time.monotonic()
+        item = _item_from_page(url, PageSnapshot.from_html(html, url))
+        if item:
+            item['_extract']['seconds'] = time.monotonic() - t0
+        return item
+    except Exception as e:
+        print(f"   x Error: {e}")
+        return None
+
+
+def _shopify_complete(shop):
+    return bool(shop.get('name') and shop.get('price') and shop.get('image'))
+
+
+def _item_from_shopify(url, shop):
+    # Vendor is sometimes the reseller's own name — only trust it when the
+    # title itself doesn't identify a brand
+    brand = normalize_brand(shop['name'], url=url)
+    if brand == 'Streetwear':
+        brand = normalize_brand(shop.get('brand', ''), url=url)
+    return _build_item(url, shop['name'], shop['price'], shop['image'], brand=brand)
+
+
+def _item_from_page(url, snap):
+    fields = extract_product(snap)
+    # GTM provides the canonical brand name (e.g. "ASICS") — use it if available
+    item = _build_item(url, fields['name'], fields['price'], fields['image'],
+                       brand=fields['brand'] or None)
+    if item:
+        # Which extractor stage each field came from (and, from parse_product_page, how
+        # long extraction took) — taken off again by _finish(), which runs in the main
+        # process even when this ran in a parse worker
+        item['_extract'] = {'stages': fields['stages']}
+    return item
 
+
+def replay_product(url, rec):
+    """Re-run extraction for one page_archive index record — no network, no browser."""
+    try:
+        body = page_archive.load(rec['sha256'])
+        if rec.get('kind') == page_archive.SHOPIFY:
+            shop = parse_shopify_product(body)
+            if _shopify_complete(shop):
+                return _item_from_shopify(url, shop)
+            print(f"   x Skipped (incomplete archived JSON): {url}")
+            return None
+        return _item_from_page(url, PageSnapshot.from_html(body, url))
     except Exception as e:
         print(f"   x Error: {e}")
         return None
@@ -640,10 +873,13 @@ def scrape_single_product(driver, url):
 # ==========================================
 # 5. COLLECTION SCRAPER
 # ==========================================
-def scrape_collection(driver, collection_url, pages=None):
+def scrape_collection(browser, collection_url, pages=None, writer=None):
     """Crawls a collection page, finds links, and scrapes them.
+    `browser` is a DriverSupervisor (or a bare WebDriver, which gets wrapped).
     Pass pages= to skip the interactive prompt (useful for batch/test mode).
+    writer (a ResultWriter) receives each item as soon as it is scraped.
     """
+    browser = driver_supervisor.supervise(browser, setup_driver)
     print(f"\n--- 📦 DETECTED COLLECTION: {collection_url} ---")
 
     if pages is None:
@@ -658,8 +894,9 @@ def scrape_collection(driver, collection_url, pages=None):
     for i in range(1, pages + 1):
         page_url = f"{collection_url}?page={i}"
         print(f"   > Scanning Page {i}...")
-        driver.get(page_url)
-        time.sleep(3)
+        driver = browser.driver
+        lean_browser.get(driver, page_url)
+        page_ready.wait_until_ready(driver, page_url, page_ready.PRODUCT_LINKS_READY_JS)
 
         links = driver.find_elements(By.TAG_NAME, "a")
         count = 0
@@ -673,36 +910,252 @@ def scrape_collection(driver, collection_url, pages=None):
 
     print(f"\n🚀 STARTING BULK SCRAPE ({len(all_product_links)} items found)...")
 
-    scraped_data = []
-    for idx, link in enumerate(all_product_links):
-        print(f"   [{idx+1}/{len(all_product_links)}] Processing...", end="\r")
-        data = scrape_single_product(driver, link)
-        if data:
-            scraped_data.append(data)
-            time.sleep(2)  # Polite delay
-
-    return scraped_data
+    return _scrape_many(browser, all_product_links, writer=writer)
 
 # ==========================================
 # 6. MAIN EXECUTION
 # ==========================================
-def scrape_url_list(driver, urls):
-    """Scrape a pre-built list of product URLs. Used for batch file mode."""
+def _scrape_one(browser, url, journal=None, writer=None, stage=None):
+    """Scrape one URL on a DriverSupervisor, journal its outcome and hand any item to the writer.
+    A dead Chrome session is restarted and the URL retried by the supervisor; any other
+    exception is reported, not raised, so one bad page never takes down the batch.
+    With a ParseStage the browser only captures the page and a Future is returned;
+    the outcome is journaled and written when the parse finishes."""
+    try:
+        if stage is None:
+            item = browser.run(scrape_single_product, url)
+        else:
+            html, item = browser.run(capture_product, url)
+            if html is not None:
+                return stage.submit(functools.partial(_finish, journal=journal, writer=writer), url, html)
+    except Exception as e:
+        return _finish(url, None, e, journal, writer)
+    return _finish(url, item, None, journal, writer)
+
+
+def _finish(url, item, error=None, journal=None, writer=None):
+    """Journal one URL's outcome, report its metrics and hand its item to the writer."""
+    extract = item.pop('_extract', None) if item else None
+    if extract:
+        extract_adapters.record(url, extract['stages'])
+        scrape_metrics.add_span(url, "extract", extract.get('seconds', 0.0))
+    if error is not None:
+        print(f"   x Error on {url}: {error}")
+        scrape_metrics.finish(url, scrape_metrics.ERROR, error=str(error))
+        if journal is not None:
+            journal.record(url, run_journal.FAILED, error=str(error))
+        return None
+    if item:
+        # Items without extractor stages came from the Shopify .js fast path
+        price_stage = extract['stages'].get('price', '') if extract else 'shopify_json'
+        scrape_metrics.finish(url, scrape_metrics.FOUND, price_stage=price_stage)
+    else:
+        scrape_metrics.finish(url, scrape_metrics.SKIPPED)
+    if journal is not None:
+        journal.record(url, run_journal.DONE if item else run_journal.SKIPPED, item=item)
+    if item and writer is not None:
+        writer.put(item)
+    return item
+
+
+def _resolved(result):
+    """An item from _scrape_one — waiting on it first if it came back as a parse Future."""
+    if isinstance(result, Future):
+        return None if result.exception() else result.result()
+    return result
+
+
+def _make_parse_stage(n_urls):
+    if PARSE_WORKERS < 1 or n_urls < 2:
+        return None
+    print(f"   🧮 Parsing in {PARSE_WORKERS} worker process(es)")
+    return ParseStage(parse_product_page, PARSE_WORKERS)
+
+
+def _make_scheduler(urls, per_host):
+    return crawl_scheduler.CrawlScheduler([url for _, url in urls], per_host, POLITE_DELAY)
+
+
+def _scrape_serial(browser, urls, total, journal=None, writer=None, stage=None):
+    """Scrape (index, url) pairs one at a time on a single supervised driver,
+    interleaving retailers so one store's politeness delay is spent on another."""
+    sched = _make_scheduler(urls, 1)
+    slots = [None] * len(urls)
+    while (job := sched.next()) is not None:
+        pos, url = job
+        print(f"   [{urls[pos][0]+1}/{total}] {url[:80]}")
+        try:
+            slots[pos] = _scrape_one(browser, url, journal, writer, stage)
+        finally:
+            sched.done(url)
+    return [item for item in slots if item]
+
+
+def _scrape_parallel(browser, urls, total, workers, journal=None, writer=None, stage=None):
+    """
+    Scrape (index, url) pairs with a pool of headless drivers sharing one CrawlScheduler,
+    which hands each free worker a URL from a retailer that is due another request.
+    Worker 0 reuses the caller's supervised driver; the rest each supervise their own Chrome.
+    Each worker writes into its own result slot, so results come back in input order.
+    A worker whose Chrome won't start simply exits; a per-URL exception only loses
+    that URL — every other worker keeps draining the scheduler.
+    On Ctrl-C the scheduler is stopped and every worker finishes the URL in hand
+    and exits before the KeyboardInterrupt reaches the caller, so nothing is
+    written to the journal or writer after the caller closes them.
+    """
+    sched = _make_scheduler(urls, PER_HOST_LIMIT)
+    slots = [None] * len(urls)
+
+    def worker(wid):
+        own = None
+        try:
+            if wid == 0:
+                sup = browser
+            else:
+                own = sup = driver_supervisor.DriverSupervisor(setup_driver, name=f"w{wid}")
+            sup.driver  # start Chrome now, so a worker that can't is dropped up front
+        except Exception as e:
+            print(f"   ⚠️  Worker {wid}: could not start Chrome ({e}) — continuing without it")
+            return
+        try:
+            while not sched.stopped.is_set() and (job := sched.next()) is not None:
+                pos, url = job
+                print(f"   [{urls[pos][0]+1}/{total}] (w{wid}) {url[:80]}")
+                try:
+                    slots[pos] = _scrape_one(sup, url, journal, writer, stage)
+                finally:
+                    sched.done(url)
+        finally:
+            if own is not None:
+                own.close()
+
+    threads = [threading.Thread(target=worker, args=(w,), daemon=True) for w in range(workers)]
+    for t in threads:
+        t.start()
+    try:
+        for t in threads:
+            t.join()
+    except KeyboardInterrupt:
+        sched.stop()
+        print("\n   ⏸  Stopping — letting workers finish the page they're on…")
+        for t in threads:
+            t.join()
+        raise
+
+    return [item for item in slots if item]
+
+
+def _scrape_many(browser, urls, workers=None, journal=None, writer=None):
+    """Scrape a list of product URLs, serially or with the worker pool (BATCH_WORKERS).
+    With a resumed journal, URLs it already finished are not fetched again and
+    their journaled items are merged back into the results in input order.
+    With a writer, every item is streamed to it as soon as it is scraped."""
+    workers = workers or BATCH_WORKERS
+    pairs = [(idx, u.strip()) for idx, u in enumerate(urls)
+             if u.strip() and not u.strip().startswith("#")]
+
+    resumed = []
+    if journal is not None:
+        todo = [(idx, u) for idx, u in pairs if not journal.is_finished(u)]
+        if len(todo) < len(pairs):
+            wanted = {u for _, u in pairs}
+            resumed = [it for it in journal.done_items() if it.get('url') in wanted]
+            seen = journal.counts()
+            print(f"   ↩️  Resuming — {seen[run_journal.DONE]} done, {seen[run_journal.SKIPPED]} skipped, "
+                  f"{seen[run_journal.FAILED]} failed last time ({len(resumed)} items recovered), "
+                  f"{len(todo)} to go")
+            if writer is not None:
+                for item in resumed:
+                    writer.put(item)
+        pairs = todo
+
+    workers = min(workers, len(pairs)) or 1
+    stage = _make_parse_stage(len(pairs))
+    try:
+        if not pairs:
+            results = []
+        elif workers > 1:
+            print(f"   ⚙️  {workers} workers, max {PER_HOST_LIMIT} concurrent per host")
+            results = _scrape_parallel(browser, pairs, len(urls), workers, journal, writer, stage)
+        else:
+            results = _scrape_serial(browser, pairs, len(urls), journal, writer, stage)
+    finally:
+        if stage is not None:
+            stage.close()  # wait for pages still being parsed
+    results = [item for item in map(_resolved, results) if item]
+
+    if resumed:
+        order = {u.strip(): i for i, u in enumerate(urls)}
+        results = sorted(resumed + results, key=lambda it: order.get(it['url'], 0))
+    return results
+
+
+def scrape_url_list(browser, urls, workers=None, journal=None, writer=None):
+    """Scrape a pre-built list of product URLs. Used for batch file mode.
+    `browser` is a DriverSupervisor (or a bare WebDriver, which gets wrapped).
+    workers > 1 (default: SNEAKER_WORKERS env var) spreads the list across a Chrome pool.
+    journal (a RunJournal) checkpoints every URL's outcome so the run can be resumed.
+    writer (a ResultWriter) receives each item as soon as it is scraped."""
     print(f"\n🚀 BATCH MODE — {len(urls)} URLs queued")
+    browser = driver_supervisor.supervise(browser, setup_driver)
+    return _scrape_many(browser, urls, workers, journal, writer)
+
+
+def replay_archive(urls=None, writer=None):
+    """Re-extract pages from page_archive (all of them, or just `urls`) at parsing
+    speed and save the items exactly like a live scrape. Used after fixing an extractor."""
+    records = page_archive.latest(urls)
+    print(f"\n♻️  REPLAY MODE — {len(records)} archived pages")
     results = []
-    for idx, url in enumerate(urls):
-        url = url.strip()
-        if not url or url.startswith("#"):
-            continue
-        print(f"   [{idx+1}/{len(urls)}] {url[:80]}")
-        data = scrape_single_product(driver, url)
-        if data:
-            results.append(data)
-        time.sleep(2)
+    for i, (url, rec) in enumerate(records.items(), 1):
+        print(f"   [{i}/{len(records)}] {url[:80]}")
+        item = replay_product(url, rec)
+        if item:
+            item.pop('_extract', None)
+            results.append(item)
+            if writer is not None:
+                writer.put(item)
     return results
 
 
+_catalog = None
+
+
+def _catalog_store():
+    global _catalog
+    if _catalog is None:
+        _catalog = catalog_store.CatalogStore(CATALOG_DB)
+    return _catalog
+
+
+def _write_catalog_batch(items):
+    """Writer sink: upsert items into the local catalog (always written, as a backup)."""
+    _catalog_store().put_many(items)
+
+
+def _write_mongo_batch(items):
+    """Writer sink: upsert items into MongoDB (deduplicates by canonical shoe name)."""
+    save_to_mongo(items, mongo_col)
+
+
+def _make_writer():
+    sinks = [_write_catalog_batch]
+    if mongo_col is not None:
+        sinks.append(_write_mongo_batch)
+    return ResultWriter(sinks)
+
+
 def main():
+    args   = sys.argv[1:]
+    resume = "--resume" in args
+    connect_mongo()
+    if "--replay" in args:
+        _replay_main([a for a in args if not a.startswith("--")])
+        return
+    if "--upload" in args:
+        _upload_main(next((a.split("=", 1)[1] for a in args if a.startswith("--since=")), None))
+        return
+
     print("==========================================")
     print("   SNEAKOPEDIA: HYBRID BOT V9.2")
     print("==========================================")
@@ -710,8 +1163,16 @@ def main():
     print("        file.txt          → scrape all")
     print("        file.txt:50       → first 50 URLs")
     print("        file.txt:pg 3:20  → page 3 at 20 per page (lines 41–60)")
+    print("        file.txt:changed  → only URLs whose sitemap lastmod is newer than our last scrape")
+    print("   Interrupted batch? Restart with --resume and paste the same spec.")
+    print("   Fixed an extractor? --replay [file.txt] re-extracts archived pages (SNEAKER_ARCHIVE=1).")
+    print(f"   Results go to {CATALOG_DB}; --upload [--since=DATE] pushes it to MongoDB.")
+    if BATCH_WORKERS > 1:
+        print(f"   Batch workers: {BATCH_WORKERS} (max {PER_HOST_LIMIT} per host)")
 
-    driver = setup_driver()
+    # Recycled every SNEAKER_RECYCLE_EVERY pages / SNEAKER_MAX_RSS_MB, restarted if it crashes
+    browser = driver_supervisor.DriverSupervisor(setup_driver)
+    browser.driver  # start Chrome up front, as before
 
     while True:
         print("\nPaste LINK, .txt FILE, or Collection URL. Type 'exit' to stop.")
@@ -723,6 +1184,7 @@ def main():
         if len(url) < 3: continue
 
         results = []
+        interrupted = False
 
         # --- DECISION LOGIC ---
         if ".txt" in url.split(":")[0] or url.endswith(".txt"):
@@ -730,6 +1192,7 @@ def main():
             #   file.txt              → all URLs
             #   file.txt:50           → first 50 URLs
             #   file.txt:pg 3:20      → page 3 at 20 per page (lines 41–60)
+            #   file.txt:changed      → only URLs modified since their last scrape
             parts = url.split(":", 1)
             filepath = parts[0].strip()
             slice_spec = parts[1].strip() if len(parts) > 1 else ""
@@ -755,40 +1218,103 @@ def main():
                     end       = start + per_page
                     batch_urls = all_urls[start:end]
                     print(f"   📄 Page {page_num} of {per_page}/pg  →  lines {start+1}–{min(end, total)} of {total} total")
+                elif slice_spec.lower() == "changed":
+                    # Incremental: only URLs whose sitemap lastmod is newer than our last scrape
+                    lastmods = recrawl.load_lastmods(filepath)
+                    if not lastmods:
+                        print(f"   ⚠️  No {recrawl.lastmod_path(filepath)} — re-run the extractor first. Scraping all.")
+                    batch_urls = recrawl.select_changed(all_urls, lastmods, recrawl.load_history())
+                    print(f"   📄 {len(batch_urls)} of {total} URLs changed since last scrape")
                 elif slice_spec.isdigit():
                     # Simple limit: first N URLs
                     n = int(slice_spec)
                     batch_urls = all_urls[:n]
                     print(f"   📄 First {n} of {total} URLs")
                 else:
-                    print(f"   ❌ Unrecognised slice: '{slice_spec}'  (use  file.txt:50  or  file.txt:pg 3:20)")
+                    print(f"   ❌ Unrecognised slice: '{slice_spec}'  (use  file.txt:50,  file.txt:pg 3:20  or  file.txt:changed)")
                     continue
 
-            results = scrape_url_list(driver, batch_urls)
+            # Items stream to the file + MongoDB while the scrape runs
+            writer = _make_writer()
+            batch_started = datetime.datetime.now(datetime.timezone.utc)
+            journal = run_journal.RunJournal(url, resume=resume)
+            try:
+                results = scrape_url_list(browser, batch_urls, journal=journal, writer=writer)
+                # Items recovered from an interrupted run keep the time they were really scraped
+                recrawl.mark_scraped((item['url'] for item in results), when=batch_started,
+                                     times=journal.resumed_times())
+            except KeyboardInterrupt:
+                # Every worker has stopped by now — save what they finished below, then exit
+                interrupted = True
+            finally:
+                journal.close()
         elif "/collections/" in url or "/search" in url:
-            results = scrape_collection(driver, url)
+            writer = _make_writer()
+            results = scrape_collection(browser, url, writer=writer)
         else:
+            writer = _make_writer()
             print("\n--- 👟 DETECTED SINGLE PRODUCT ---")
-            data = scrape_single_product(driver, url)
+            data = _finish(url, browser.run(scrape_single_product, url), writer=writer)
             if data:
                 results.append(data)
 
+        page_ready.save_stats()
+        extract_adapters.save_stats()
+        scrape_metrics.flush()
+
         # --- SAVE RESULTS ---
+        # Flush whatever the writer still holds; everything else is already saved
+        writer.close()
+        if interrupted:
+            print(f"\n   ⏸  Interrupted — {writer.written} items saved, progress kept in {journal.path}")
+            print("      Run  python3 sneaker_bot.py --resume  and paste the same spec to continue.")
+            break
         if results:
-            # Always write to file as backup
-            print(f"\n💾 SAVING {len(results)} ITEMS TO FILE...")
-            with open(OUTPUT_FILE, "a", encoding="utf-8") as f:
-                for item in results:
-                    json_str = json.dumps(item, indent=4)
-                    f.write(json_str + ",\n")
-            print("✅ File saved.")
-
-            # Write to MongoDB if connected (deduplicates by canonical shoe name)
-            if mongo_col is not None:
-                print(f"📡 UPLOADING {len(results)} ITEMS TO MONGODB...")
-                save_to_mongo(results, mongo_col)
-
-    driver.quit()
+            print(f"\n✅ {writer.written} items saved to {CATALOG_DB}"
+                  + (" and MongoDB." if mongo_col is not None else "."))
+
+    browser.close()
+
+def _replay_main(files):
+    """--replay [file.txt ...]: re-extract the archive (optionally only those files' URLs)."""
+    urls = None
+    if files:
+        urls = []
+        for filepath in files:
+            try:
+                with open(filepath, "r", encoding="utf-8") as f:
+                    urls += [l.strip() for l in f if l.strip() and not l.startswith("#")]
+            except FileNotFoundError:
+                print(f"   ❌ File not found: {filepath}")
+                return
+    writer = _make_writer()
+    try:
+        results = replay_archive(urls, writer=writer)
+    finally:
+        writer.close()
+    print(f"\n✅ {writer.written} replayed items saved to {CATALOG_DB}"
+          + (" and MongoDB." if mongo_col is not None else "."))
+
+UPLOAD_BATCH = 500
+
+
+def _upload_main(since=None):
+    """--upload [--since=DATE]: push the local catalog (or items scraped since DATE) to MongoDB."""
+    if mongo_col is None:
+        print("   ❌ No MongoDB connection — set MONGODB_URI to upload.")
+        return
+    batch, sent = [], 0
+    for item in _catalog_store().query(since=since):
+        batch.append(item)
+        if len(batch) >= UPLOAD_BATCH:
+            save_to_mongo(batch, mongo_col)
+            sent += len(batch)
+            batch = []
+    if batch:
+        save_to_mongo(batch, mongo_col)
+        sent += len(batch)
+    scrape_metrics.flush()
+    print(f"\n✅ {sent} catalog items uploaded to MongoDB.")
 
 if __name__ == "__main__":
     main()
@@ -15,6 +15,9 @@ from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from sneaker_bot import extract_name, extract_price, normalize_brand
+from page_snapshot import PageSnapshot
+import lean_browser
+import page_ready
 
 # ──────────────────────────────────────────────────────────────────────────
 # STORES TO TEST — collection URL + expected base domain for product links
@@ -93,7 +96,10 @@ def setup_driver():
         "user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
         "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
     )
-    return webdriver.Chrome(options=options)
+    lean_browser.apply_options(options)
+    driver = webdriver.Chrome(options=options)
+    lean_browser.enable(driver)
+    return driver
 
 
 def find_first_product(driver, collection_url, base_domain, scroll=False, wait=4):
@@ -103,7 +109,7 @@ def find_first_product(driver, collection_url, base_domain, scroll=False, wait=4
     Returns None if none found.
     """
     try:
-        driver.get(collection_url)
+        lean_browser.get(driver, collection_url)
         time.sleep(wait)
 
         if scroll:
@@ -162,8 +168,8 @@ def test_store(driver, store):
 
     # Step 2 — scrape the product page
     try:
-        driver.get(product_url)
-        time.sleep(5)
+        lean_browser.get(driver, product_url)
+        page_ready.wait_until_ready(driver, product_url)
 
         page_title = driver.title.lower()
         if "404" in page_title or "not found" in page_title:
@@ -171,8 +177,9 @@ def test_store(driver, store):
             result["note"]   = "Product URL returned 404"
             return result
 
-        name  = extract_name(driver)
-        price = extract_price(driver)
+        snap  = PageSnapshot.from_driver(driver)
+        name  = extract_name(snap)
+        price = extract_price(snap)
         brand = normalize_brand(name, url=product_url)
 
         result["name"]  = name